@@ -4,15 +4,37 @@ Mock Infoblox WAPI Server for Testing
 Implements minimal WAPI v2.12.3 endpoints needed for sync testing
 """
 
+import base64
 from flask import Flask, jsonify, request, Response
-from functools import wraps
+from flask.json.provider import JSONProvider
+import hmac
 import logging
+import os
+import orjson
+import threading
+from werkzeug.serving import make_ssl_devcert
+
+
+class ORJSONProvider(JSONProvider):
+    """Serialize responses with orjson instead of the stdlib json module"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 logging.basicConfig(level=logging.INFO)
 
 # Mock database
-HOST_RECORDS = [
+_SEED_HOST_RECORDS = [
     {
         "_ref": "record:host/ZG5zLmhvc3QkLl9kZWZhdWx0LmNvbS5leGFtcGxlLmhvc3Qx:host1.example.com/default",
         "name": "host1.example.com",
@@ -55,6 +77,26 @@ HOST_RECORDS = [
     }
 ]
 
+# gunicorn runs this app with many threads; every read or write of the
+# mutable state below (records, lazy bodies) holds this lock
+_STATE_LOCK = threading.Lock()
+
+# Host records keyed by _ref are the source of truth (dicts keep insertion
+# order); the name index makes existence checks O(1)
+HOST_RECORDS_BY_REF: dict[str, dict] = {r['_ref']: r for r in _SEED_HOST_RECORDS}
+HOST_RECORDS_BY_NAME: dict[str, dict] = {r['name']: r for r in _SEED_HOST_RECORDS}
+
+# List view for GET-all, rebuilt lazily after a create or delete
+_host_records_list = None
+
+
+def host_records():
+    """Return all host records as a list, cached until the next write (call with _STATE_LOCK held)"""
+    global _host_records_list
+    if _host_records_list is None:
+        _host_records_list = list(HOST_RECORDS_BY_REF.values())
+    return _host_records_list
+
 NETWORK_VIEWS = [
     {
         "_ref": "networkview/ZG5zLm5ldHdvcmtfdmlldyQw:default/true",
@@ -164,127 +206,219 @@ IPV4_SHARED_NETWORKS = [
     }
 ]
 
+# Pre-serialized bodies for collections that never change at runtime
+_WAPI_ROOT_BODY = orjson.dumps({
+    "supported_objects": ["record:host"],
+    "supported_versions": ["2.12.3"],
+    "version": "2.12.3"
+})
+_NETWORK_VIEWS_BODY = orjson.dumps(NETWORK_VIEWS)
+_NETWORK_CONTAINERS_BODY = orjson.dumps(IPV4_NETWORK_CONTAINERS)
+_FIXED_ADDRESSES_BODY = orjson.dumps(FIXED_ADDRESSES)
+_RANGES_BODY = orjson.dumps(IPV4_RANGES)
+_ALIAS_RECORDS_BODY = orjson.dumps(ALIAS_RECORDS)
+_SHARED_NETWORKS_BODY = orjson.dumps(IPV4_SHARED_NETWORKS)
+
+# IPV4_NETWORKS grows on POST, so its body is rebuilt lazily after each write
+_networks_body = None
+
+
+def _json_response(body, status=200):
+    return Response(body, status=status, mimetype='application/json')
+
 # Basic auth check
+_USERNAME = b"admin"
+_PASSWORD = b"admin123!"
+
 def check_auth(username, password):
-    return username == "admin" and password == "admin123!"
-
-def requires_auth(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        auth = request.authorization
-        if not auth or not check_auth(auth.username, auth.password):
-            return Response(
-                'Authentication required\n',
-                401,
-                {'WWW-Authenticate': 'Basic realm="WAPI"'}
-            )
-        return f(*args, **kwargs)
-    return decorated
+    # Constant-time compares; bitwise & so both always run
+    return bool(
+        hmac.compare_digest((username or "").encode(), _USERNAME)
+        & hmac.compare_digest((password or "").encode(), _PASSWORD)
+    )
+
+@app.before_request
+def authenticate():
+    """Require basic auth on every WAPI endpoint"""
+    if not request.path.startswith('/wapi/'):
+        return None
+    
+    # Checked on every request so the constant-time compares always run
+    auth = request.authorization
+    ok = bool(auth) and check_auth(auth.username, auth.password)
+    
+    if not ok:
+        return Response(
+            'Authentication required\n',
+            401,
+            {'WWW-Authenticate': 'Basic realm="WAPI"'}
+        )
+    return None
 
 @app.route('/wapi/v2.12.3/', methods=['GET'])
-@requires_auth
 def wapi_root():
     """WAPI version info endpoint"""
-    return jsonify({
-        "supported_objects": ["record:host"],
-        "supported_versions": ["2.12.3"],
-        "version": "2.12.3"
-    })
+    return _json_response(_WAPI_ROOT_BODY)
 
 @app.route('/wapi/v2.12.3/record:host', methods=['GET'])
-@requires_auth
 def get_host_records():
     """Get host records with optional filtering"""
     name = request.args.get('name')
     max_results = request.args.get('_max_results', type=int, default=1000)
+    page_id = request.args.get('_page_id')
     
-    app.logger.info(f"GET /record:host - name={name}, max_results={max_results}")
+    app.logger.info("GET /record:host - name=%s, max_results=%s", name, max_results)
     
-    if name:
-        # Filter by name for existence check
-        results = [r for r in HOST_RECORDS if r['name'] == name]
-    else:
-        # Return all (up to max_results)
-        results = HOST_RECORDS[:max_results]
+    if page_id or request.args.get('_paging') == '1':
+        # Paged results; the page id encodes "<offset>:<page size>"
+        if page_id:
+            start, max_results = (int(part) for part in page_id.split(':'))
+        else:
+            start = 0
+        with _STATE_LOCK:
+            records = host_records()
+            page = {"result": records[start:start + max_results]}
+            if start + max_results < len(records):
+                page["next_page_id"] = f"{start + max_results}:{max_results}"
+            return jsonify(page)
     
-    return jsonify(results)
+    with _STATE_LOCK:
+        if name:
+            # Filter by name for existence check
+            rec = HOST_RECORDS_BY_NAME.get(name)
+            results = [rec] if rec else []
+        else:
+            # Return all (up to max_results), skipping the copy when nothing is cut
+            records = host_records()
+            results = records if max_results >= len(records) else records[:max_results]
+        return jsonify(results)
 
-@app.route('/wapi/v2.12.3/record:host', methods=['POST'])
-@requires_auth
-def create_host_record():
-    """Create a new host record"""
-    data = request.get_json()
-    app.logger.info(f"POST /record:host - data={data}")
-    
-    name = data.get('name')
-    ipv4addrs = data.get('ipv4addrs', [])
+def _add_host_record(data):
+    """Store a new host record and return its _ref (call with _STATE_LOCK held)"""
+    global _host_records_list
+    name = data['name']
     network_view = data.get('view', 'default')  # Get network view from request
     
-    if not name or not ipv4addrs:
-        return jsonify({"Error": "name and ipv4addrs are required"}), 400
-    
     # Create new record with the specified network view
     new_ref = f"record:host/ZG5zLmhvc3QkLl9kZWZhdWx0LmNvbS5leGFtcGxlLm5ldw:{name}/{network_view}"
     new_record = {
         "_ref": new_ref,
         "name": name,
-        "ipv4addrs": ipv4addrs,
+        "ipv4addrs": data['ipv4addrs'],
         "view": network_view,
         "extattrs": data.get('extattrs', {}),
         "comment": data.get('comment', '')
     }
     
-    HOST_RECORDS.append(new_record)
-    app.logger.info(f"Created host record: {name} in view: {network_view}")
+    HOST_RECORDS_BY_REF[new_ref] = new_record
+    HOST_RECORDS_BY_NAME[name] = new_record
+    _host_records_list = None
+    app.logger.info("Created host record: %s in view: %s", name, network_view)
+    return new_ref
+
+def _update_host_record(record, data):
+    """Apply an update payload to a stored host record (call with _STATE_LOCK held)"""
+    old_name = record['name']
+    record.update({
+        'name': data.get('name', record['name']),
+        'ipv4addrs': data.get('ipv4addrs', record['ipv4addrs']),
+        'extattrs': data.get('extattrs', record['extattrs']),
+        'comment': data.get('comment', record.get('comment', ''))
+    })
+    if record['name'] != old_name:
+        if HOST_RECORDS_BY_NAME.get(old_name) is record:
+            del HOST_RECORDS_BY_NAME[old_name]
+        HOST_RECORDS_BY_NAME[record['name']] = record
+    app.logger.info("Updated host record: %s", record['name'])
+
+@app.route('/wapi/v2.12.3/record:host', methods=['POST'])
+def create_host_record():
+    """Create a new host record"""
+    data = request.get_json()
+    app.logger.info("POST /record:host - data=%s", data)
     
-    return jsonify(new_ref), 201
+    if not data.get('name') or not data.get('ipv4addrs'):
+        return jsonify({"Error": "name and ipv4addrs are required"}), 400
+    
+    with _STATE_LOCK:
+        ref = _add_host_record(data)
+    return jsonify(ref), 201
 
 @app.route('/wapi/v2.12.3/<path:ref>', methods=['PUT'])
-@requires_auth
 def update_host_record(ref):
     """Update an existing host record"""
     data = request.get_json()
-    app.logger.info(f"PUT /{ref} - data={data}")
+    app.logger.info("PUT /%s - data=%s", ref, data)
     
-    # Find record by ref
-    for i, record in enumerate(HOST_RECORDS):
-        if record['_ref'] == ref:
-            # Update record
-            record.update({
-                'name': data.get('name', record['name']),
-                'ipv4addrs': data.get('ipv4addrs', record['ipv4addrs']),
-                'extattrs': data.get('extattrs', record['extattrs']),
-                'comment': data.get('comment', record.get('comment', ''))
-            })
-            app.logger.info(f"Updated host record: {record['name']}")
-            return jsonify(ref)
+    with _STATE_LOCK:
+        record = HOST_RECORDS_BY_REF.get(ref)
+        if record is None:
+            return jsonify({"Error": "Record not found"}), 404
+        _update_host_record(record, data)
+    return jsonify(ref)
+
+@app.route('/wapi/v2.12.3/request', methods=['POST'])
+def multi_request():
+    """Run a list of host record sub-requests (WAPI multi-object request)"""
+    body = request.get_json()
+    app.logger.info("POST /request - %s sub-requests", len(body))
     
-    return jsonify({"Error": "Record not found"}), 404
+    # Validation and writes share one lock hold so the batch is atomic
+    with _STATE_LOCK:
+        # Validate every sub-request before applying any, so a bad item leaves
+        # the store untouched like the real (transactional) WAPI
+        subs = []
+        for sub in body:
+            method = sub.get('method')
+            obj = sub.get('object')
+            data = sub.get('data') or {}
+            if method == 'POST' and obj == 'record:host':
+                if not data.get('name') or not data.get('ipv4addrs'):
+                    return jsonify({"Error": "name and ipv4addrs are required"}), 400
+            elif not ((method == 'GET' and obj == 'record:host')
+                      or (method == 'PUT' and obj in HOST_RECORDS_BY_REF)):
+                return jsonify({"Error": f"Unsupported sub-request: {method} {obj}"}), 400
+            subs.append((method, obj, data))
+        
+        results = []
+        for method, obj, data in subs:
+            if method == 'GET':
+                rec = HOST_RECORDS_BY_NAME.get(data.get('name'))
+                results.append([rec] if rec else [])
+            elif method == 'POST':
+                results.append(_add_host_record(data))
+            else:
+                _update_host_record(HOST_RECORDS_BY_REF[obj], data)
+                results.append(obj)
+        
+        return jsonify(results)
 
 @app.route('/wapi/v2.12.3/<path:ref>', methods=['DELETE'])
-@requires_auth
 def delete_host_record(ref):
     """Delete a host record"""
-    app.logger.info(f"DELETE /{ref}")
-    
-    for i, record in enumerate(HOST_RECORDS):
-        if record['_ref'] == ref:
-            HOST_RECORDS.pop(i)
-            app.logger.info(f"Deleted host record: {record['name']}")
-            return jsonify(ref)
+    global _host_records_list
+    app.logger.info("DELETE /%s", ref)
     
-    return jsonify({"Error": "Record not found"}), 404
+    with _STATE_LOCK:
+        record = HOST_RECORDS_BY_REF.pop(ref, None)
+        if record is None:
+            return jsonify({"Error": "Record not found"}), 404
+        
+        if HOST_RECORDS_BY_NAME.get(record['name']) is record:
+            del HOST_RECORDS_BY_NAME[record['name']]
+        _host_records_list = None
+    app.logger.info("Deleted host record: %s", record['name'])
+    return jsonify(ref)
 
 @app.route('/wapi/v2.12.3/networkview', methods=['GET'])
-@requires_auth
 def get_network_views():
     """Get network views"""
-    return jsonify(NETWORK_VIEWS)
+    return _json_response(_NETWORK_VIEWS_BODY)
 
 @app.route('/wapi/v2.12.3/network', methods=['GET', 'POST'])
-@requires_auth
 def networks():
     """Get or create IPv4 networks"""
+    global _networks_body
     if request.method == 'POST':
         # Create new network
         data = request.get_json()
@@ -292,70 +426,83 @@ def networks():
         comment = data.get('comment', '')
         network_view = data.get('network_view', 'default')
         
-        # Check if network already exists
-        if any(n['network'] == network_cidr for n in IPV4_NETWORKS):
-            return jsonify({
-                "Error": "AdmConDataError: None (IBDataConflictError: IB.Data.Conflict:The network already exists.)",
-                "code": "Client.Ibap.Data.Conflict",
-                "text": "The network already exists."
-            }), 400
-        
-        # Create network reference
-        import base64
-        ref_data = f"network${network_cidr}/{network_view}"
-        ref_b64 = base64.b64encode(ref_data.encode()).decode()
-        ref = f"network/{ref_b64}:{network_cidr}/{network_view}"
-        
-        # Add to networks list
-        new_network = {
-            "_ref": ref,
-            "network": network_cidr,
-            "network_view": network_view,
-            "comment": comment,
-            "extattrs": {}
-        }
-        IPV4_NETWORKS.append(new_network)
+        # Check and append under one lock hold so concurrent POSTs cannot both add
+        with _STATE_LOCK:
+            if any(n['network'] == network_cidr for n in IPV4_NETWORKS):
+                return jsonify({
+                    "Error": "AdmConDataError: None (IBDataConflictError: IB.Data.Conflict:The network already exists.)",
+                    "code": "Client.Ibap.Data.Conflict",
+                    "text": "The network already exists."
+                }), 400
+            
+            # Create network reference
+            ref_b64 = base64.b64encode(f"network${network_cidr}/{network_view}".encode('ascii')).decode('ascii')
+            ref = f"network/{ref_b64}:{network_cidr}/{network_view}"
+            
+            # Add to networks list
+            new_network = {
+                "_ref": ref,
+                "network": network_cidr,
+                "network_view": network_view,
+                "comment": comment,
+                "extattrs": {}
+            }
+            IPV4_NETWORKS.append(new_network)
+            _networks_body = None
         
         # Return just the ref (standard Infoblox behavior)
         return jsonify(ref), 201
     else:
         # GET - return all networks
-        return jsonify(IPV4_NETWORKS)
+        with _STATE_LOCK:
+            if _networks_body is None:
+                _networks_body = orjson.dumps(IPV4_NETWORKS)
+            body = _networks_body
+        return _json_response(body)
 
 @app.route('/wapi/v2.12.3/networkcontainer', methods=['GET'])
-@requires_auth
 def get_network_containers():
     """Get IPv4 network containers"""
-    return jsonify(IPV4_NETWORK_CONTAINERS)
+    return _json_response(_NETWORK_CONTAINERS_BODY)
 
 @app.route('/wapi/v2.12.3/fixedaddress', methods=['GET'])
-@requires_auth
 def get_fixed_addresses():
     """Get IPv4 fixed addresses"""
-    return jsonify(FIXED_ADDRESSES)
+    return _json_response(_FIXED_ADDRESSES_BODY)
 
 @app.route('/wapi/v2.12.3/range', methods=['GET'])
-@requires_auth
 def get_ranges():
     """Get IPv4 ranges"""
-    return jsonify(IPV4_RANGES)
+    return _json_response(_RANGES_BODY)
 
 @app.route('/wapi/v2.12.3/record:cname', methods=['GET'])
-@requires_auth
 def get_cname_records():
     """Get CNAME (alias) records"""
-    return jsonify(ALIAS_RECORDS)
+    return _json_response(_ALIAS_RECORDS_BODY)
 
 @app.route('/wapi/v2.12.3/sharednetwork', methods=['GET'])
-@requires_auth
 def get_shared_networks():
     """Get IPv4 shared networks"""
-    return jsonify(IPV4_SHARED_NETWORKS)
+    return _json_response(_SHARED_NETWORKS_BODY)
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({"status": "ok", "records": len(HOST_RECORDS)})
+    with _STATE_LOCK:
+        count = len(HOST_RECORDS_BY_REF)
+    return jsonify({"status": "ok", "records": count})
+
+# Self-signed certificate cached on disk so restarts skip RSA key generation
+SSL_CACHE_DIR = os.environ.get('MOCK_SSL_DIR', '/tmp/mock-infoblox-ssl')
+
+def ssl_cert_pair():
+    """Return (cert, key) paths, generating the pair on first use"""
+    base = os.path.join(SSL_CACHE_DIR, 'mock-infoblox')
+    cert, key = f"{base}.crt", f"{base}.key"
+    if not (os.path.exists(cert) and os.path.exists(key)):
+        os.makedirs(SSL_CACHE_DIR, exist_ok=True)
+        make_ssl_devcert(base, host='localhost')
+    return cert, key
 
 if __name__ == '__main__':
     print("=" * 60)
@@ -364,8 +511,8 @@ if __name__ == '__main__':
     print(f"Listening on: https://0.0.0.0:443")
     print(f"Username: admin")
     print(f"Password: admin123!")
-    print(f"Test records: {len(HOST_RECORDS)}")
+    print(f"Test records: {len(HOST_RECORDS_BY_REF)}")
     print("=" * 60)
     
     # Run with SSL
-    app.run(host='0.0.0.0', port=443, ssl_context='adhoc')
+    app.run(host='0.0.0.0', port=443, ssl_context=ssl_cert_pair())
@@ -0,0 +1,12 @@
+# Gunicorn settings for the mock WAPI server.
+# State lives in process memory, so run a single worker and scale with threads
+# (app.py serializes access to that state with one lock).
+from app import ssl_cert_pair
+
+bind = "0.0.0.0:443"
+workers = 1
+worker_class = "gthread"
+threads = 16
+keepalive = 30
+
+certfile, keyfile = ssl_cert_pair()
@@ -1,8 +1,11 @@
 __all__ = [
     "app",
+    "cache",
     "config",
     "infoblox_client",
+    "jobs",
     "mapper",
     "sync_service",
+    "transport",
     "wug_client",
 ]
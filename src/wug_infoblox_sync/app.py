@@ -1,511 +1,834 @@
 from __future__ import annotations
 
+import atexit
+import functools
+import gzip
+import hashlib
+import itertools
 import logging
-from flask import Flask, jsonify, request, render_template
-from dotenv import load_dotenv
+import operator
+import os
+import queue
+import threading
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
 
-from .config import load_settings
+import click
+import orjson
+from flask import Flask, Response, abort, jsonify, make_response, request, stream_with_context
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import HTTPException
+from werkzeug.local import LocalProxy
+
+from .cache import TTLCache
+from .config import Settings, load_settings
 from .sync_service import SyncService
-from .wug_client import WUGClient
-from .infoblox_client import InfobloxClient
-from .models import InfobloxHostRecord
+from .jobs import JobRunner
+from .models import InfobloxHostRecord, SyncResult
 from . import ip_utils
 
+if TYPE_CHECKING:
+    from .infoblox_client import InfobloxClient
+    from .wug_client import WUGClient
+
+
+# Bodies for the constant /api and /status responses, serialized once
+_API_INFO_BODY = orjson.dumps({
+    "service": "wug-infoblox-sync",
+    "version": "1.0.0",
+    "endpoints": {
+        "GET /status": "Health check",
+        "POST /sync": "Start a WUG to Infoblox sync job (payload: {limit?: number, details?: boolean})",
+        "POST /dry-run": "Dry run WUG to Infoblox sync (payload: {limit?: number, details?: boolean})",
+        "POST /reverse-sync": "Start an Infoblox to WUG sync job (payload: {limit?: number, details?: boolean})",
+        "POST /reverse-dry-run": "Dry run Infoblox to WUG sync (payload: {limit?: number, details?: boolean})",
+        "POST /add-test-device": "Add test device to WUG (payload: {display_name, ip_address, hostname?})",
+        "POST /add-test-host": "Add test host record to Infoblox and WUG (payload: {hostname, ip_address, comment?, enable_monitoring?})",
+        "GET /jobs/<job_id>": "Get the status and result of a sync job",
+        "POST /cache/invalidate": "Drop cached Infoblox data (payload: {keys?: ['used-ips', 'networks']})",
+        "GET /wug-devices": "Get all devices from WUG",
+        "GET /infoblox-hosts": "Get all host records from Infoblox",
+        "DELETE /infoblox-hosts/<hostname>": "Delete a host record from Infoblox",
+        "GET /infoblox/network-views": "Get all network views from Infoblox",
+        "GET /infoblox/networks": "Get all IPv4 networks from Infoblox",
+        "GET /infoblox/networks-with-utilization": "Get all networks with IP utilization and allocated IPs",
+        "POST /infoblox/network": "Create new network block (payload: {network: '192.168.10.0/24', comment?: 'description'})",
+        "GET /infoblox/network-containers": "Get all IPv4 network containers from Infoblox",
+        "GET /infoblox/fixed-addresses": "Get all IPv4 fixed addresses from Infoblox",
+        "GET /infoblox/ranges": "Get all IPv4 DHCP ranges from Infoblox",
+        "GET /infoblox/alias-records": "Get all alias (CNAME) records from Infoblox",
+        "GET /infoblox/shared-networks": "Get all IPv4 shared networks from Infoblox",
+        "GET /infoblox/networks/<ref>/utilization": "Get IP utilization for network (query: ?network=192.168.1.0/24)",
+        "GET /infoblox/networks/<ref>/available-ips": "Get available IPs in network (query: ?network=192.168.1.0/24&limit=100)",
+        "GET /infoblox/networks/<ref>/next-available-ip": "Get next available IP in network (query: ?network=192.168.1.0/24)",
+        "POST /wug/device": "Create device in WUG (payload: {display_name, ip_address, hostname?, enable_monitoring?})",
+        "POST /combined/add-device": "Add device to Infoblox and optionally WUG (payload: {hostname, ip_address, network?, add_to_wug?, enable_monitoring?})"
+    }
+})
+_STATUS_BODY = orjson.dumps({"service": "wug-infoblox-sync", "status": "ok"})
+
+# Message for the JSON 500 returned when a view raises, keyed by endpoint;
+# placeholders are filled from the URL variables
+_ERROR_MESSAGES = {
+    "get_wug_devices": "Failed to fetch devices from WUG",
+    "get_infoblox_hosts": "Failed to fetch host records from Infoblox",
+    "delete_infoblox_host": "Failed to delete host record '{hostname}'",
+    "get_network_views": "Failed to fetch network views from Infoblox",
+    "get_networks": "Failed to fetch networks from Infoblox",
+    "get_networks_with_utilization": "Failed to fetch networks with utilization from Infoblox",
+    "create_network": "Failed to create network in Infoblox",
+    "get_network_containers": "Failed to fetch network containers from Infoblox",
+    "get_fixed_addresses": "Failed to fetch fixed addresses from Infoblox",
+    "get_ranges": "Failed to fetch ranges from Infoblox",
+    "get_alias_records": "Failed to fetch alias records from Infoblox",
+    "get_shared_networks": "Failed to fetch shared networks from Infoblox",
+    "add_test_device": "Failed to add device to WUG",
+    "get_network_utilization": "Failed to calculate network utilization",
+    "get_available_ips": "Failed to fetch available IPs",
+    "get_next_available_ip": "Failed to fetch next available IP",
+    "create_wug_device": "Failed to create device in WUG",
+    "add_device_combined": "Failed to add device",
+}
+
+# Largest request body accepted; every endpoint takes a small JSON object
+MAX_CONTENT_LENGTH = 64 * 1024
+
+# Responses smaller than this are not worth gzipping
+_COMPRESS_MIN_SIZE = 1024
+_COMPRESS_LEVEL = 4
+_COMPRESS_MIMETYPES = frozenset({"application/json", "text/html"})
+
+# /infoblox-hosts row keys and the matching fields of a simplified host record
+_HOST_ROW_KEYS = ("name", "ip_address", "comment", "extattrs")
+_host_row_values = operator.itemgetter("hostname", "ip_address", "comment", "extattrs")
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+            mimetype="application/json",
+        )
+
+
+def _request_payload() -> dict[str, Any]:
+    """Parse the request body as a JSON object, or return {} if absent or invalid."""
+    # Bodyless control-plane POSTs skip reading the stream entirely
+    if request.content_length == 0:
+        return {}
+    raw = request.get_data(cache=False)
+    if not raw:
+        return {}
+    try:
+        payload = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+# Request payload schemas: field -> (accepted type, default). _REQUIRED marks
+# fields that must be present and non-empty.
+_REQUIRED = object()
+_TYPE_NAMES = {int: "an integer", str: "a string", bool: "a boolean"}
+_SYNC_SCHEMA: dict[str, tuple[type, Any]] = {"limit": (int, None), "details": (bool, True)}
+_ADD_TEST_DEVICE_SCHEMA: dict[str, tuple[type, Any]] = {
+    "display_name": (str, _REQUIRED),
+    "ip_address": (str, _REQUIRED),
+    "hostname": (str, None),
+}
+_ADD_TEST_HOST_SCHEMA: dict[str, tuple[type, Any]] = {
+    "hostname": (str, _REQUIRED),
+    "ip_address": (str, _REQUIRED),
+    "comment": (str, ""),
+    "enable_monitoring": (bool, True),
+}
+
+
+def _parse_payload(schema: dict[str, tuple[type, Any]]) -> tuple[dict[str, Any], str | None]:
+    """
+    Read the request body and check it against schema.
+    Returns the field values (with defaults filled in) and an error message, or None.
+    """
+    payload = _request_payload()
+    values: dict[str, Any] = {}
+    missing = []
+    for name, (kind, default) in schema.items():
+        value = payload.get(name)
+        if value is None or value == "":
+            if default is _REQUIRED:
+                missing.append(name)
+            values[name] = None if default is _REQUIRED else default
+        elif type(value) is not kind:
+            return {}, f"{name} must be {_TYPE_NAMES[kind]}"
+        else:
+            values[name] = value
+    if missing:
+        verb = "is" if len(missing) == 1 else "are"
+        return {}, f"{' and '.join(missing)} {verb} required"
+    return values, None
+
+
+def _with_etag(body: bytes) -> tuple[bytes, str]:
+    """Pair a serialized body with its ETag, for caching the two together."""
+    return body, hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+@functools.lru_cache(maxsize=32)
+def _gzip_body(body: bytes) -> bytes:
+    """Gzip a cached response body once, however many times it is served."""
+    return gzip.compress(body, compresslevel=_COMPRESS_LEVEL)
+
+
+def _will_gzip(response: Response) -> bool:
+    """Whether _compress_response gzips this response for the current request."""
+    return (
+        200 <= response.status_code < 300
+        and not response.direct_passthrough
+        and response.mimetype in _COMPRESS_MIMETYPES
+        and "Content-Encoding" not in response.headers
+        and request.accept_encodings["gzip"]
+        and (response.is_streamed or len(response.get_data()) >= _COMPRESS_MIN_SIZE)
+    )
+
+
+def _set_conditional(response: Response, etag: str) -> Response:
+    """
+    Give a response a strong ETag and honour If-None-Match.
+    
+    A gzipped body is a different representation and gets its own validator
+    (RFC 9110), and Vary is set before the check so 304s carry it too.
+    """
+    if response.mimetype in _COMPRESS_MIMETYPES:
+        response.vary.add("Accept-Encoding")
+    if _will_gzip(response):
+        etag = f"{etag}-gzip"
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def _conditional_json(body: bytes, etag: str) -> Response:
+    """Wrap a serialized JSON body in a response that honours If-None-Match."""
+    response = Response(body, mimetype="application/json")
+    gzipped = _will_gzip(response)
+    _set_conditional(response, etag)
+    # Cached bodies are served repeatedly, so reuse their compressed form
+    # instead of leaving _compress_response to gzip them on every hit
+    if gzipped and response.status_code == 200:
+        response.set_data(_gzip_body(body))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def _etagged(view: Callable[..., Any]) -> Callable[..., Response]:
+    """Give a view's successful JSON response an ETag and honour If-None-Match."""
+    @functools.wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Response:
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            _set_conditional(response, _with_etag(response.get_data())[1])
+        return response
+    return wrapper
+
+
+def _gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # wbits=31 selects the gzip container
+    compressor = zlib.compressobj(_COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _compress_response(response: Response) -> Response:
+    """Gzip JSON and HTML responses for clients that accept it."""
+    if (
+        not 200 <= response.status_code < 300
+        or response.direct_passthrough
+        or response.mimetype not in _COMPRESS_MIMETYPES
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    if not request.accept_encodings["gzip"]:
+        return response
+    if response.is_streamed:
+        response.response = _gzip_chunks(response.response)
+    else:
+        body = response.get_data()
+        if len(body) < _COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(gzip.compress(body, compresslevel=_COMPRESS_LEVEL))
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+class _PerProcessQueueHandler(QueueHandler):
+    """
+    Queue records for a listener thread that is started on first use in each
+    process. A thread does not survive fork, so gunicorn workers each start
+    their own instead of restarting the parent's listener.
+    """
+
+    def __init__(self, handler: logging.Handler):
+        super().__init__(queue.SimpleQueue())
+        self._target = handler
+        self._pid: int | None = None
+        self._start_lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        # The parent's lock may have been held at fork time
+        self._start_lock = threading.Lock()
+        self._pid = None
+
+    def _ensure_listener(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            # Records the parent queued before fork belong to its listener
+            self.queue = queue.SimpleQueue()
+            listener = QueueListener(self.queue, self._target)
+            listener.start()
+            atexit.register(listener.stop)
+            self._pid = pid
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self._ensure_listener()
+        super().enqueue(record)
+
+
+@functools.lru_cache(maxsize=1)
+def _configure_logging(level_name: str) -> None:
+    """
+    Send root logging through a queue drained by a background listener thread,
+    so request threads never wait on the stderr lock. Records are formatted
+    when queued (QueueHandler.prepare), so they show the values at log time.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    root.setLevel(getattr(logging, level_name.upper(), logging.INFO))
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    root.addHandler(_PerProcessQueueHandler(stream_handler))
+
+
+@functools.lru_cache(maxsize=1)
+def _settings() -> Settings:
+    """Read .env and the environment once per process."""
+    from dotenv import load_dotenv
 
-def create_app() -> Flask:
     load_dotenv()
-    settings = load_settings()
+    return load_settings()
 
-    logging.basicConfig(level=getattr(logging, settings.sync_log_level.upper(), logging.INFO))
+
+# One client per process, so every app instance and the sync service share
+# the same connection pools and WUG device-IP cache. The client modules (and
+# requests with them) are imported on first use to keep worker startup light
+@functools.lru_cache(maxsize=1)
+def _wug_client(settings: Settings) -> WUGClient:
+    from .wug_client import WUGClient
+
+    return WUGClient(settings)
+
+
+@functools.lru_cache(maxsize=1)
+def _infoblox_client(settings: Settings) -> InfobloxClient:
+    from .infoblox_client import InfobloxClient
+
+    return InfobloxClient(settings)
+
+
+def create_app() -> Flask:
+    settings = _settings()
+
+    _configure_logging(settings.sync_log_level)
 
     app = Flask(__name__)
-    service = SyncService(settings)
-    wug_client = WUGClient(settings)
-    infoblox_client = InfobloxClient(settings)
+    app.json = ORJSONProvider(app)
+    app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
+    app.after_request(_compress_response)
+
+    @app.before_request
+    def reject_oversized_body() -> None:
+        # Checked up front so handlers that catch Exception cannot turn the 413 into a 500
+        if (request.content_length or 0) > MAX_CONTENT_LENGTH:
+            abort(413)
+
+    @app.errorhandler(Exception)
+    def handle_error(e: Exception) -> Response | tuple:
+        """Turn any exception a view did not handle itself into a JSON 500."""
+        if isinstance(e, HTTPException):
+            return e
+        logging.exception("Error handling %s %s", request.method, request.path)
+        message = _ERROR_MESSAGES.get(request.endpoint, "Request failed")
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "message": message.format(**(request.view_args or {}))
+        }), 500
+
+    # Clients are built on first use, so a worker that never calls WUG or
+    # Infoblox does not set up their sessions and pools
+    wug_client = LocalProxy(lambda: _wug_client(settings))
+    infoblox_client = LocalProxy(lambda: _infoblox_client(settings))
+    service = SyncService(settings, wug_client=wug_client, infoblox_client=infoblox_client)
+    # Serialized /wug-devices and /infoblox-hosts bodies and their ETags, keyed by (endpoint, limit),
+    # so dashboard polling within the TTL does not hit WUG or Infoblox again
+    listing_cache = TTLCache(settings.cache_ttl_seconds)
+    # Infoblox data shared by the utilization endpoints: "networks" and the
+    # parsed "used-ips" index
+    infoblox_cache = TTLCache(settings.cache_ttl_seconds)
+
+    def invalidate_caches() -> None:
+        listing_cache.clear()
+        infoblox_cache.clear()
+    # /sync and /reverse-sync run here so they do not hold a request thread
+    job_runner = JobRunner(settings.sync_job_dir)
+    # Fans out independent upstream calls made within a single request
+    io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="request-io")
+
+    def start_job(run: Callable[..., SyncResult], limit: int | None, include_details: bool) -> tuple:
+        def job() -> dict[str, Any]:
+            result = run(dry_run=False, limit=limit)
+            invalidate_caches()
+            return SyncService.result_dict(result, include_details=include_details)
+
+        job_id = job_runner.submit(job)
+        response = jsonify({"job_id": job_id, "status": "running", "status_url": f"/jobs/{job_id}"})
+        response.headers["Location"] = f"/jobs/{job_id}"
+        return response, 202
+
+    def fetch_used_ips() -> tuple[list[str], array]:
+        """
+        Get every IP used by a host record or fixed address, indexed by
+        ip_utils.index_ips. Both lists are fetched concurrently and the
+        parsed result is cached.
+        """
+        def build() -> tuple[list[str], array]:
+            hosts_future = io_executor.submit(infoblox_client.get_all_host_records)
+            fixed_addresses = infoblox_client.get_fixed_addresses()
+            # get_all_host_records transforms records to a single ip_address field
+            used_ips = [record["ip_address"] for record in hosts_future.result() if record.get("ip_address")]
+            used_ips.extend(fixed["ipv4addr"] for fixed in fixed_addresses if "ipv4addr" in fixed)
+            # An IP can be both a host record and a fixed address; count it once
+            return ip_utils.index_ips(dict.fromkeys(used_ips))
+
+        return infoblox_cache.get_or_set("used-ips", build)
+
+    # The dashboard template has no dynamic inputs, so render it once
+    index_html = app.jinja_env.get_template("index.html").render().encode("utf-8")
+    index_etag = hashlib.blake2b(index_html, digest_size=8).hexdigest()
 
     @app.get("/")
     def index():
         """Dashboard UI"""
-        return render_template("index.html")
+        response = Response(index_html, mimetype="text/html")
+        return _set_conditional(response, index_etag)
+
+    @app.cli.command("export-dashboard")
+    @click.argument("path", type=click.Path(dir_okay=False, writable=True))
+    def export_dashboard(path: str) -> None:
+        """Write the rendered dashboard HTML to PATH for a reverse proxy to serve."""
+        with open(path, "wb") as handle:
+            handle.write(index_html)
+        click.echo(f"Wrote dashboard to {path}")
 
     @app.get("/api")
-    def api_info() -> tuple:
-        return jsonify({
-            "service": "wug-infoblox-sync",
-            "version": "1.0.0",
-            "endpoints": {
-                "GET /status": "Health check",
-                "POST /sync": "Sync WUG devices to Infoblox (payload: {limit?: number})",
-                "POST /dry-run": "Dry run WUG to Infoblox sync (payload: {limit?: number})",
-                "POST /reverse-sync": "Sync Infoblox host records to WUG (payload: {limit?: number})",
-                "POST /reverse-dry-run": "Dry run Infoblox to WUG sync (payload: {limit?: number})",
-                "POST /add-test-device": "Add test device to WUG (payload: {display_name, ip_address, hostname?})",
-                "POST /add-test-host": "Add test host record to Infoblox and WUG (payload: {hostname, ip_address, comment?, enable_monitoring?})",
-                "GET /wug-devices": "Get all devices from WUG",
-                "GET /infoblox-hosts": "Get all host records from Infoblox",
-                "DELETE /infoblox-hosts/<hostname>": "Delete a host record from Infoblox",
-                "GET /infoblox/network-views": "Get all network views from Infoblox",
-                "GET /infoblox/networks": "Get all IPv4 networks from Infoblox",
-                "GET /infoblox/networks-with-utilization": "Get all networks with IP utilization and allocated IPs",
-                "POST /infoblox/network": "Create new network block (payload: {network: '192.168.10.0/24', comment?: 'description'})",
-                "GET /infoblox/network-containers": "Get all IPv4 network containers from Infoblox",
-                "GET /infoblox/fixed-addresses": "Get all IPv4 fixed addresses from Infoblox",
-                "GET /infoblox/ranges": "Get all IPv4 DHCP ranges from Infoblox",
-                "GET /infoblox/alias-records": "Get all alias (CNAME) records from Infoblox",
-                "GET /infoblox/shared-networks": "Get all IPv4 shared networks from Infoblox",
-                "GET /infoblox/networks/<ref>/utilization": "Get IP utilization for network (query: ?network=192.168.1.0/24)",
-                "GET /infoblox/networks/<ref>/available-ips": "Get available IPs in network (query: ?network=192.168.1.0/24&limit=100)",
-                "GET /infoblox/networks/<ref>/next-available-ip": "Get next available IP in network (query: ?network=192.168.1.0/24)",
-                "POST /wug/device": "Create device in WUG (payload: {display_name, ip_address, hostname?, enable_monitoring?})",
-                "POST /combined/add-device": "Add device to Infoblox and optionally WUG (payload: {hostname, ip_address, network?, add_to_wug?, enable_monitoring?})"
-            }
-        }), 200
+    def api_info() -> Response:
+        return Response(_API_INFO_BODY, mimetype="application/json")
 
     @app.get("/status")
-    def status() -> tuple:
-        return jsonify({"service": "wug-infoblox-sync", "status": "ok"}), 200
+    def status() -> Response:
+        response = Response(_STATUS_BODY, mimetype="application/json")
+        response.headers["Cache-Control"] = "public, max-age=5"
+        return response
 
     @app.get("/wug-devices")
-    def get_wug_devices() -> tuple:
+    def get_wug_devices() -> Response | tuple:
         """Get all devices from WUG"""
-        try:
-            limit = request.args.get("limit", type=int)
+        limit = request.args.get("limit", type=int)
+
+        def build() -> tuple[bytes, str]:
             devices = wug_client.get_devices(limit=limit)
-            
-            # Format devices for display
-            device_list = []
-            for device in devices:
-                device_list.append({
-                    "id": device.get("id"),
-                    "name": device.get("displayName", device.get("name", "Unknown")),
-                    "ip_address": device.get("primaryAddress", device.get("ipAddress", "N/A")),
-                    "hostname": device.get("networkName", device.get("hostname", "N/A")),
-                    "device_type": device.get("deviceType", "Unknown"),
-                    "status": device.get("isUp", "Unknown")
-                })
-            
-            return jsonify({
+
+            # Format devices for display; get_devices has already resolved
+            # id, name, address and status from the raw WUG payload
+            device_list = [
+                {
+                    "id": device.source_id,
+                    "name": device.hostname,
+                    "ip_address": device.ip_address,
+                    "hostname": device.raw.get("networkName") or device.hostname,
+                    "device_type": device.raw.get("deviceType", "Unknown"),
+                    "status": device.status
+                }
+                for device in devices
+            ]
+
+            return _with_etag(orjson.dumps({
                 "success": True,
                 "count": len(device_list),
                 "devices": device_list
-            }), 200
-            
-        except Exception as e:
-            logging.exception("Error fetching WUG devices")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch devices from WUG"
-            }), 500
+            }))
+
+        cached = listing_cache.get_or_set(("wug-devices", limit), build)
+        return _conditional_json(*cached)
 
     @app.get("/infoblox-hosts")
-    def get_infoblox_hosts() -> tuple:
-        """Get all host records from Infoblox"""
-        try:
-            limit = request.args.get("limit", type=int, default=1000)
-            hosts = infoblox_client.get_all_host_records(limit=limit)
-            
-            # Format hosts for display
-            # Note: get_all_host_records() transforms the API response:
-            # - "name" becomes "hostname"  
-            # - "ipv4addrs" becomes "ip_address"
-            host_list = []
-            for host in hosts:
-                host_list.append({
-                    "name": host.get("hostname", "Unknown"),
-                    "ip_address": host.get("ip_address", "N/A"),
-                    "comment": host.get("comment", ""),
-                    "extattrs": host.get("extattrs", {})
-                })
-            
-            return jsonify({
-                "success": True,
-                "count": len(host_list),
-                "hosts": host_list
-            }), 200
-            
-        except Exception as e:
-            logging.exception("Error fetching Infoblox hosts")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch host records from Infoblox"
-            }), 500
+    def get_infoblox_hosts() -> Response | tuple:
+        """Get all host records from Infoblox, streamed page by page"""
+        limit = request.args.get("limit", type=int, default=1000)
+        cache_key = ("infoblox-hosts", limit)
+        cached = listing_cache.get(cache_key)
+        if cached is not None:
+            return _conditional_json(*cached)
+        # Taken before the first fetch, so a body read before a write that
+        # lands mid-stream is not cached
+        generation = listing_cache.generation
+        hosts = infoblox_client.iter_host_records(limit=limit)
+        # Pull the first page eagerly so connection and auth errors still
+        # produce a 500 instead of a truncated stream
+        first = next(hosts, None)
+
+        def generate() -> Iterator[bytes]:
+            # "count" goes last since it is only known once the stream ends;
+            # chunks are kept so a completed stream can be served from cache
+            chunks = [b'{"success":true,"hosts":[']
+            yield chunks[0]
+            count = 0
+            if first is not None:
+                for host in itertools.chain((first,), hosts):
+                    chunk = orjson.dumps(dict(zip(_HOST_ROW_KEYS, _host_row_values(host))))
+                    if count:
+                        chunk = b"," + chunk
+                    chunks.append(chunk)
+                    yield chunk
+                    count += 1
+            chunks.append(b'],"count":%d}' % count)
+            yield chunks[-1]
+            listing_cache.set(cache_key, _with_etag(b"".join(chunks)), generation)
+
+        return Response(stream_with_context(generate()), mimetype="application/json")
 
     @app.delete("/infoblox-hosts/<hostname>")
     def delete_infoblox_host(hostname: str) -> tuple:
         """Delete a host record from Infoblox"""
-        try:
-            result = infoblox_client.delete_host_record(hostname)
-            
-            if result.get("success"):
-                return jsonify({
-                    "success": True,
-                    "message": result.get("message"),
-                    "hostname": hostname
-                }), 200
-            else:
-                return jsonify({
-                    "success": False,
-                    "error": result.get("message"),
-                    "hostname": hostname
-                }), 404
-                
-        except Exception as e:
-            logging.exception(f"Error deleting host {hostname}")
+        result = infoblox_client.delete_host_record(hostname)
+        invalidate_caches()
+        
+        if result.get("success"):
+            return jsonify({
+                "success": True,
+                "message": result.get("message"),
+                "hostname": hostname
+            }), 200
+        else:
             return jsonify({
                 "success": False,
-                "error": str(e),
-                "message": f"Failed to delete host record '{hostname}'"
-            }), 500
+                "error": result.get("message"),
+                "hostname": hostname
+            }), 404
 
     @app.get("/infoblox/network-views")
+    @_etagged
     def get_network_views() -> tuple:
         """Get all network views from Infoblox"""
-        try:
-            views = infoblox_client.get_network_views()
-            return jsonify({
-                "success": True,
-                "count": len(views),
-                "network_views": views
-            }), 200
-        except Exception as e:
-            logging.exception("Error fetching network views")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch network views from Infoblox"
-            }), 500
+        views = infoblox_client.get_network_views()
+        return jsonify({
+            "success": True,
+            "count": len(views),
+            "network_views": views
+        }), 200
 
     @app.get("/infoblox/networks")
+    @_etagged
     def get_networks() -> tuple:
         """Get all IPv4 networks from Infoblox"""
-        try:
-            networks = infoblox_client.get_ipv4_networks()
-            return jsonify({
-                "success": True,
-                "count": len(networks),
-                "networks": networks
-            }), 200
-        except Exception as e:
-            logging.exception("Error fetching networks")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch networks from Infoblox"
-            }), 500
+        networks = infoblox_client.get_ipv4_networks()
+        return jsonify({
+            "success": True,
+            "count": len(networks),
+            "networks": networks
+        }), 200
 
     @app.get("/infoblox/networks-with-utilization")
-    def get_networks_with_utilization() -> tuple:
+    def get_networks_with_utilization() -> Response | tuple:
         """Get all IPv4 networks from Infoblox with IP utilization data"""
-        try:
-            # Get all networks
-            networks = infoblox_client.get_ipv4_networks()
-            
-            # Get all used IPs
-            host_records = infoblox_client.get_all_host_records()
-            fixed_addresses = infoblox_client.get_fixed_addresses()
-            
-            # Build map of all used IPs
-            all_used_ips = []
-            
-            # Extract IPs from host records (get_all_host_records transforms to ip_address field)
-            for record in host_records:
-                if "ip_address" in record and record["ip_address"]:
-                    all_used_ips.append(record["ip_address"])
-            
-            # Extract IPs from fixed addresses
-            for fixed in fixed_addresses:
-                if "ipv4addr" in fixed:
-                    all_used_ips.append(fixed["ipv4addr"])
-            
-            # Calculate utilization for each network
-            networks_with_util = []
-            for network in networks:
-                network_cidr = network.get("network")
-                if network_cidr and ip_utils.validate_network(network_cidr):
-                    # Filter used IPs to those in this network
-                    network_used_ips = [
-                        ip for ip in all_used_ips 
-                        if ip_utils.ip_in_network(ip, network_cidr)
-                    ]
-                    
-                    # Calculate utilization
-                    utilization = ip_utils.calculate_utilization(network_cidr, network_used_ips)
-                    
-                    # Combine network info with utilization
-                    network_with_util = {
-                        **network,
-                        "utilization": {
-                            "total_ips": utilization["total_ips"],
-                            "used_ips": utilization["used_ips"],
-                            "available_ips": utilization["available_ips"],
-                            "utilization_percent": utilization["utilization_percent"]
-                        },
-                        "allocated_ips": network_used_ips  # List of IPs in use
-                    }
-                    networks_with_util.append(network_with_util)
-                else:
-                    # Network without valid CIDR, add without utilization
-                    networks_with_util.append(network)
-            
-            return jsonify({
-                "success": True,
-                "count": len(networks_with_util),
-                "networks": networks_with_util
-            }), 200
-            
-        except Exception as e:
-            logging.exception("Error fetching networks with utilization")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch networks with utilization from Infoblox"
-            }), 500
+        # Get all networks and all used IPs concurrently
+        networks_future = io_executor.submit(
+            infoblox_cache.get_or_set, "networks", infoblox_client.get_ipv4_networks
+        )
+        all_used_ips, used_ip_values = fetch_used_ips()
+        networks = networks_future.result()
+        
+        # Assign used IPs to every valid network by binary search over the sorted index
+        ips_by_network = ip_utils.group_ips_by_network(all_used_ips, [
+            network["network"] for network in networks
+            if network.get("network") and ip_utils.validate_network(network["network"])
+        ], used_ip_values)
+
+        def network_with_util(network: dict[str, Any]) -> dict[str, Any]:
+            network_cidr = network.get("network")
+            network_used_ips = ips_by_network.get(network_cidr)
+            if network_used_ips is None:
+                # Network without valid CIDR, add without utilization
+                return network
+            
+            # Grouping already guarantees every IP is inside the network, so
+            # utilization only needs the count
+            utilization = ip_utils.utilization_for_count(network_cidr, len(network_used_ips))
+            
+            # Combine network info with utilization
+            return {
+                **network,
+                "utilization": {
+                    "total_ips": utilization["total_ips"],
+                    "used_ips": utilization["used_ips"],
+                    "available_ips": utilization["available_ips"],
+                    "utilization_percent": utilization["utilization_percent"]
+                },
+                "allocated_ips": network_used_ips  # List of IPs in use
+            }
+
+        def generate() -> Iterator[bytes]:
+            # Serialize one network at a time so large allocated_ips lists are
+            # never all held as JSON at once
+            yield b'{"success":true,"count":%d,"networks":[' % len(networks)
+            for index, network in enumerate(networks):
+                if index:
+                    yield b","
+                yield orjson.dumps(network_with_util(network))
+            yield b"]}"
+
+        return Response(stream_with_context(generate()), mimetype="application/json")
 
     @app.post("/infoblox/network")
     def create_network() -> tuple:
         """Create a new IPv4 network in Infoblox"""
+        payload = _request_payload()
+        network = payload.get("network")
+        comment = payload.get("comment", "")
+        
+        if not network:
+            return jsonify({
+                "success": False,
+                "error": "Missing required field",
+                "message": "network field is required (e.g., '192.168.10.0/24')"
+            }), 400
+        
+        # Validate network CIDR
+        if not ip_utils.validate_network(network):
+            return jsonify({
+                "success": False,
+                "error": "Invalid network CIDR",
+                "message": "Network must be in valid CIDR notation (e.g., '192.168.10.0/24')"
+            }), 400
+        
         try:
-            payload = request.get_json(silent=True) or {}
-            network = payload.get("network")
-            comment = payload.get("comment", "")
-            
-            if not network:
-                return jsonify({
-                    "success": False,
-                    "error": "Missing required field",
-                    "message": "network field is required (e.g., '192.168.10.0/24')"
-                }), 400
-            
-            # Validate network CIDR
-            if not ip_utils.validate_network(network):
-                return jsonify({
-                    "success": False,
-                    "error": "Invalid network CIDR",
-                    "message": "Network must be in valid CIDR notation (e.g., '192.168.10.0/24')"
-                }), 400
-            
             result = infoblox_client.create_network(
                 network_cidr=network,
                 comment=comment
             )
-            
-            return jsonify(result), 201
-            
         except Exception as e:
-            logging.exception("Error creating network")
-            error_msg = str(e)
+            error_msg = str(e).lower()
             # Check for duplicate network error
-            if "already exists" in error_msg.lower() or "duplicate" in error_msg.lower():
-                return jsonify({
-                    "success": False,
-                    "error": "Network already exists",
-                    "message": f"Network {payload.get('network')} already exists in Infoblox"
-                }), 409
+            if "already exists" not in error_msg and "duplicate" not in error_msg:
+                raise
             return jsonify({
                 "success": False,
-                "error": str(e),
-                "message": "Failed to create network in Infoblox"
-            }), 500
+                "error": "Network already exists",
+                "message": f"Network {network} already exists in Infoblox"
+            }), 409
+        infoblox_cache.pop("networks")
+        
+        return jsonify(result), 201
 
     @app.get("/infoblox/network-containers")
+    @_etagged
     def get_network_containers() -> tuple:
         """Get all IPv4 network containers from Infoblox"""
-        try:
-            containers = infoblox_client.get_ipv4_network_containers()
-            return jsonify({
-                "success": True,
-                "count": len(containers),
-                "network_containers": containers
-            }), 200
-        except Exception as e:
-            logging.exception("Error fetching network containers")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch network containers from Infoblox"
-            }), 500
+        containers = infoblox_client.get_ipv4_network_containers()
+        return jsonify({
+            "success": True,
+            "count": len(containers),
+            "network_containers": containers
+        }), 200
 
     @app.get("/infoblox/fixed-addresses")
+    @_etagged
     def get_fixed_addresses() -> tuple:
         """Get all IPv4 fixed addresses from Infoblox"""
-        try:
-            addresses = infoblox_client.get_fixed_addresses()
-            return jsonify({
-                "success": True,
-                "count": len(addresses),
-                "fixed_addresses": addresses
-            }), 200
-        except Exception as e:
-            logging.exception("Error fetching fixed addresses")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch fixed addresses from Infoblox"
-            }), 500
+        addresses = infoblox_client.get_fixed_addresses()
+        return jsonify({
+            "success": True,
+            "count": len(addresses),
+            "fixed_addresses": addresses
+        }), 200
 
     @app.get("/infoblox/ranges")
+    @_etagged
     def get_ranges() -> tuple:
         """Get all IPv4 ranges from Infoblox"""
-        try:
-            ranges = infoblox_client.get_ipv4_ranges()
-            return jsonify({
-                "success": True,
-                "count": len(ranges),
-                "ranges": ranges
-            }), 200
-        except Exception as e:
-            logging.exception("Error fetching ranges")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch ranges from Infoblox"
-            }), 500
+        ranges = infoblox_client.get_ipv4_ranges()
+        return jsonify({
+            "success": True,
+            "count": len(ranges),
+            "ranges": ranges
+        }), 200
 
     @app.get("/infoblox/alias-records")
+    @_etagged
     def get_alias_records() -> tuple:
         """Get all alias (CNAME) records from Infoblox"""
-        try:
-            aliases = infoblox_client.get_alias_records()
-            return jsonify({
-                "success": True,
-                "count": len(aliases),
-                "alias_records": aliases
-            }), 200
-        except Exception as e:
-            logging.exception("Error fetching alias records")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch alias records from Infoblox"
-            }), 500
+        aliases = infoblox_client.get_alias_records()
+        return jsonify({
+            "success": True,
+            "count": len(aliases),
+            "alias_records": aliases
+        }), 200
 
     @app.get("/infoblox/shared-networks")
+    @_etagged
     def get_shared_networks() -> tuple:
         """Get all IPv4 shared networks from Infoblox"""
-        try:
-            shared_nets = infoblox_client.get_ipv4_shared_networks()
-            return jsonify({
-                "success": True,
-                "count": len(shared_nets),
-                "shared_networks": shared_nets
-            }), 200
-        except Exception as e:
-            logging.exception("Error fetching shared networks")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch shared networks from Infoblox"
-            }), 500
+        shared_nets = infoblox_client.get_ipv4_shared_networks()
+        return jsonify({
+            "success": True,
+            "count": len(shared_nets),
+            "shared_networks": shared_nets
+        }), 200
 
     @app.post("/add-test-device")
     def add_test_device() -> tuple:
         """Add a test device to WUG"""
-        payload = request.get_json(silent=True) or {}
-        display_name = payload.get("display_name")
-        ip_address = payload.get("ip_address")
-        hostname = payload.get("hostname", ip_address)
+        values, error = _parse_payload(_ADD_TEST_DEVICE_SCHEMA)
+        if error:
+            return jsonify({"error": error}), 400
+        display_name = values["display_name"]
+        ip_address = values["ip_address"]
+        hostname = values["hostname"] or ip_address
 
-        if not display_name or not ip_address:
-            return jsonify({"error": "display_name and ip_address are required"}), 400
-
-        try:
-            # Check if device already exists
-            if wug_client.device_exists(ip_address):
-                return jsonify({
-                    "error": f"Device with IP {ip_address} already exists in WUG",
-                    "ip_address": ip_address
-                }), 409
-
-            # Add device to WUG
-            result = wug_client.create_device(
-                display_name=display_name,
-                ip_address=ip_address,
-                hostname=hostname,
-                device_type="Windows",
-                primary_role="Server",
-                poll_interval=300
-            )
-            
+        # Check if device already exists
+        if wug_client.device_exists(ip_address):
             return jsonify({
-                "success": True,
-                "message": f"Device '{display_name}' added to WUG",
-                "device": {
-                    "display_name": display_name,
-                    "ip_address": ip_address,
-                    "hostname": hostname
-                },
-                "wug_response": result
-            }), 201
+                "error": f"Device with IP {ip_address} already exists in WUG",
+                "ip_address": ip_address
+            }), 409
 
-        except Exception as e:
-            logging.exception("Error adding test device")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to add device to WUG"
-            }), 500
+        # Add device to WUG
+        result = wug_client.create_device(
+            display_name=display_name,
+            ip_address=ip_address,
+            hostname=hostname,
+            device_type="Windows",
+            primary_role="Server",
+            poll_interval=300
+        )
+        invalidate_caches()
+        
+        return jsonify({
+            "success": True,
+            "message": f"Device '{display_name}' added to WUG",
+            "device": {
+                "display_name": display_name,
+                "ip_address": ip_address,
+                "hostname": hostname
+            },
+            "wug_response": result
+        }), 201
 
     @app.post("/add-test-host")
     def add_test_host() -> tuple:
         """Add a test host record to Infoblox and device to WUG"""
-        payload = request.get_json(silent=True) or {}
-        hostname = payload.get("hostname")
-        ip_address = payload.get("ip_address")
-        comment = payload.get("comment", "")
-        enable_monitoring = payload.get("enable_monitoring", True)
-
-        if not hostname or not ip_address:
-            return jsonify({"error": "hostname and ip_address are required"}), 400
+        values, error = _parse_payload(_ADD_TEST_HOST_SCHEMA)
+        if error:
+            return jsonify({"error": error}), 400
+        hostname = values["hostname"]
+        ip_address = values["ip_address"]
+        comment = values["comment"]
+        enable_monitoring = values["enable_monitoring"]
 
-        infoblox_result = None
-        wug_result = None
+        # Create InfobloxHostRecord object
+        extattrs = {
+            "Source": {"value": "Manual"},
+            "Created": {"value": "Dashboard"}
+        }
+        if comment:
+            extattrs["Comment"] = {"value": comment}
         
+        host_record = InfobloxHostRecord(
+            fqdn=hostname,
+            ip_address=ip_address,
+            network_view="default",
+            extattrs=extattrs
+        )
+
+        def add_to_wug() -> dict[str, Any]:
+            # Try to add device to WUG (don't fail if this times out)
+            try:
+                if wug_client.device_exists(ip_address):
+                    return {
+                        "success": False,
+                        "message": f"Device with IP {ip_address} already exists in WUG",
+                        "skipped": True
+                    }
+                return wug_client.create_device(
+                    display_name=hostname,
+                    ip_address=ip_address,
+                    hostname=hostname,
+                    device_type="Network Device",
+                    primary_role="Device",
+                    poll_interval=300,
+                    enable_monitoring=enable_monitoring
+                )
+            except Exception as e:
+                logging.exception("Error adding device to WUG")
+                return {
+                    "success": False,
+                    "message": f"WUG operation failed or timed out: {str(e)}",
+                    "error": True
+                }
+
+        # The Infoblox and WUG writes are independent, so run them together
+        wug_future = io_executor.submit(add_to_wug)
         try:
-            # Create InfobloxHostRecord object
-            extattrs = {
-                "Source": {"value": "Manual"},
-                "Created": {"value": "Dashboard"}
-            }
-            if comment:
-                extattrs["Comment"] = {"value": comment}
-            
-            host_record = InfobloxHostRecord(
-                fqdn=hostname,
-                ip_address=ip_address,
-                network_view="default",
-                extattrs=extattrs
-            )
-            
             # Add host record to Infoblox
             infoblox_result = infoblox_client.upsert_host_record(
                 record=host_record,
                 dry_run=False
             )
-            
         except Exception as e:
             logging.exception("Error adding host to Infoblox")
+            wug_result = wug_future.result()
+            invalidate_caches()
             return jsonify({
                 "error": str(e),
-                "message": "Failed to add host record to Infoblox"
+                "message": "Failed to add host record to Infoblox",
+                "wug_response": wug_result
             }), 500
+        wug_result = wug_future.result()
         
-        # Try to add device to WUG (don't fail if this times out)
-        try:
-            if wug_client.device_exists(ip_address):
-                wug_result = {
-                    "success": False,
-                    "message": f"Device with IP {ip_address} already exists in WUG",
-                    "skipped": True
-                }
-            else:
-                wug_result = wug_client.create_device(
-                    display_name=hostname,
-                    ip_address=ip_address,
-                    hostname=hostname,
-                    device_type="Network Device",
-                    primary_role="Device",
-                    poll_interval=300,
-                    enable_monitoring=enable_monitoring
-                )
-        except Exception as e:
-            logging.exception("Error adding device to WUG")
-            wug_result = {
-                "success": False,
-                "message": f"WUG operation failed or timed out: {str(e)}",
-                "error": True
-            }
-        
+        invalidate_caches()
+
         # Build response
         message = f"Host '{hostname}' added to Infoblox"
         warning = None
@@ -547,96 +870,96 @@ def create_app() -> Flask:
 
     @app.post("/sync")
     def sync() -> tuple:
-        payload = request.get_json(silent=True) or {}
-        limit = payload.get("limit")
-        result = service.run_sync(dry_run=False, limit=limit)
-        return jsonify(SyncService.result_dict(result)), 200
+        values, error = _parse_payload(_SYNC_SCHEMA)
+        if error:
+            return jsonify({"error": error}), 400
+        return start_job(service.run_sync, values["limit"], values["details"])
 
     @app.post("/dry-run")
     def dry_run() -> tuple:
-        payload = request.get_json(silent=True) or {}
-        limit = payload.get("limit")
-        result = service.run_sync(dry_run=True, limit=limit)
-        return jsonify(SyncService.result_dict(result)), 200
+        values, error = _parse_payload(_SYNC_SCHEMA)
+        if error:
+            return jsonify({"error": error}), 400
+        result = service.run_sync(dry_run=True, limit=values["limit"])
+        return jsonify(SyncService.result_dict(result, include_details=values["details"])), 200
 
     @app.post("/reverse-sync")
     def reverse_sync() -> tuple:
         """Import devices from Infoblox into WhatsUp Gold"""
-        payload = request.get_json(silent=True) or {}
-        limit = payload.get("limit")
-        result = service.run_reverse_sync(dry_run=False, limit=limit)
-        return jsonify(SyncService.result_dict(result)), 200
+        values, error = _parse_payload(_SYNC_SCHEMA)
+        if error:
+            return jsonify({"error": error}), 400
+        return start_job(service.run_reverse_sync, values["limit"], values["details"])
 
     @app.post("/reverse-dry-run")
     def reverse_dry_run() -> tuple:
         """Dry run of importing devices from Infoblox into WhatsUp Gold"""
-        payload = request.get_json(silent=True) or {}
-        limit = payload.get("limit")
-        result = service.run_reverse_sync(dry_run=True, limit=limit)
-        return jsonify(SyncService.result_dict(result)), 200
+        values, error = _parse_payload(_SYNC_SCHEMA)
+        if error:
+            return jsonify({"error": error}), 400
+        result = service.run_reverse_sync(dry_run=True, limit=values["limit"])
+        return jsonify(SyncService.result_dict(result, include_details=values["details"])), 200
+
+    @app.post("/cache/invalidate")
+    def invalidate_cache() -> tuple:
+        """Drop cached Infoblox data after out-of-band changes (payload: {keys?: [...]})"""
+        keys = _request_payload().get("keys")
+        if not keys:
+            invalidate_caches()
+        elif not isinstance(keys, list) or not all(isinstance(key, str) for key in keys):
+            return jsonify({"error": "keys must be a list of strings"}), 400
+        else:
+            for key in keys:
+                infoblox_cache.pop(key)
+            listing_cache.clear()
+        return jsonify({"success": True, "invalidated": keys or "all"}), 200
+
+    @app.get("/jobs/<job_id>")
+    def get_job(job_id: str) -> tuple:
+        """Get the status of a background sync job, with its result once completed"""
+        job = job_runner.status(job_id)
+        if job is None:
+            return jsonify({"error": f"Job '{job_id}' not found"}), 404
+        return jsonify(job), 200
 
     # IP Space Management Endpoints
     
     @app.get("/infoblox/networks/<network_ref>/utilization")
+    @_etagged
     def get_network_utilization(network_ref: str) -> tuple:
         """
         Get IP utilization statistics for a specific network.
         Query params:
           - network: CIDR notation (e.g., 192.168.1.0/24)
         """
-        try:
-            # Get network CIDR from query params or decode from ref
-            network_cidr = request.args.get("network")
-            if not network_cidr:
-                return jsonify({
-                    "error": "Missing 'network' query parameter",
-                    "message": "Please provide network in CIDR notation (e.g., ?network=192.168.1.0/24)"
-                }), 400
-            
-            if not ip_utils.validate_network(network_cidr):
-                return jsonify({
-                    "error": "Invalid network CIDR",
-                    "message": "Network must be in CIDR notation (e.g., 192.168.1.0/24)"
-                }), 400
-            
-            # Get all used IPs from Infoblox for this network
-            host_records = infoblox_client.get_all_host_records()
-            fixed_addresses = infoblox_client.get_fixed_addresses()
-            
-            used_ips = []
-            
-            # Extract IPs from host records
-            for record in host_records:
-                if "ipv4addrs" in record:
-                    for ipv4 in record["ipv4addrs"]:
-                        if "ipv4addr" in ipv4:
-                            ip = ipv4["ipv4addr"]
-                            if ip_utils.ip_in_network(ip, network_cidr):
-                                used_ips.append(ip)
-            
-            # Extract IPs from fixed addresses
-            for fixed in fixed_addresses:
-                if "ipv4addr" in fixed:
-                    ip = fixed["ipv4addr"]
-                    if ip_utils.ip_in_network(ip, network_cidr):
-                        used_ips.append(ip)
-            
-            # Calculate utilization
-            utilization = ip_utils.calculate_utilization(network_cidr, used_ips)
-            
+        # Get network CIDR from query params or decode from ref
+        network_cidr = request.args.get("network")
+        if not network_cidr:
             return jsonify({
-                "success": True,
-                "utilization": utilization
-            }), 200
-            
-        except Exception as e:
-            logging.exception("Error calculating network utilization")
+                "error": "Missing 'network' query parameter",
+                "message": "Please provide network in CIDR notation (e.g., ?network=192.168.1.0/24)"
+            }), 400
+        
+        if not ip_utils.validate_network(network_cidr):
             return jsonify({
-                "error": str(e),
-                "message": "Failed to calculate network utilization"
-            }), 500
+                "error": "Invalid network CIDR",
+                "message": "Network must be in CIDR notation (e.g., 192.168.1.0/24)"
+            }), 400
+        
+        # Get all used IPs from Infoblox for this network
+        all_used_ips, used_ip_values = fetch_used_ips()
+        used_ips = ip_utils.group_ips_by_network(all_used_ips, [network_cidr], used_ip_values)[network_cidr]
+        
+        # Calculate utilization
+        utilization = ip_utils.utilization_for_count(network_cidr, len(used_ips))
+        
+        return jsonify({
+            "success": True,
+            "utilization": utilization
+        }), 200
 
     @app.get("/infoblox/networks/<network_ref>/available-ips")
+    @_etagged
     def get_available_ips(network_ref: str) -> tuple:
         """
         Get list of available IP addresses in a network.
@@ -644,126 +967,77 @@ def create_app() -> Flask:
           - network: CIDR notation (e.g., 192.168.1.0/24)
           - limit: Max number of IPs to return (default: 100)
         """
-        try:
-            network_cidr = request.args.get("network")
-            if not network_cidr:
-                return jsonify({
-                    "error": "Missing 'network' query parameter",
-                    "message": "Please provide network in CIDR notation (e.g., ?network=192.168.1.0/24)"
-                }), 400
-            
-            if not ip_utils.validate_network(network_cidr):
-                return jsonify({
-                    "error": "Invalid network CIDR",
-                    "message": "Network must be in CIDR notation (e.g., 192.168.1.0/24)"
-                }), 400
-            
-            limit = request.args.get("limit", type=int, default=100)
-            
-            # Get all used IPs from Infoblox for this network
-            host_records = infoblox_client.get_all_host_records()
-            fixed_addresses = infoblox_client.get_fixed_addresses()
-            
-            used_ips = []
-            
-            # Extract IPs from host records
-            for record in host_records:
-                if "ipv4addrs" in record:
-                    for ipv4 in record["ipv4addrs"]:
-                        if "ipv4addr" in ipv4:
-                            ip = ipv4["ipv4addr"]
-                            if ip_utils.ip_in_network(ip, network_cidr):
-                                used_ips.append(ip)
-            
-            # Extract IPs from fixed addresses
-            for fixed in fixed_addresses:
-                if "ipv4addr" in fixed:
-                    ip = fixed["ipv4addr"]
-                    if ip_utils.ip_in_network(ip, network_cidr):
-                        used_ips.append(ip)
-            
-            # Get available IPs
-            available = ip_utils.get_available_ips(network_cidr, used_ips, limit=limit)
-            
+        network_cidr = request.args.get("network")
+        if not network_cidr:
             return jsonify({
-                "success": True,
-                "network": network_cidr,
-                "count": len(available),
-                "available_ips": available
-            }), 200
-            
-        except Exception as e:
-            logging.exception("Error fetching available IPs")
+                "error": "Missing 'network' query parameter",
+                "message": "Please provide network in CIDR notation (e.g., ?network=192.168.1.0/24)"
+            }), 400
+        
+        if not ip_utils.validate_network(network_cidr):
             return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch available IPs"
-            }), 500
+                "error": "Invalid network CIDR",
+                "message": "Network must be in CIDR notation (e.g., 192.168.1.0/24)"
+            }), 400
+        
+        limit = request.args.get("limit", type=int, default=100)
+        if limit < 0:
+            return jsonify({
+                "error": "Invalid limit",
+                "message": "limit must be 0 or greater"
+            }), 400
+        
+        # Get all used IPs from Infoblox for this network
+        all_used_ips, used_ip_values = fetch_used_ips()
+        used_ips = ip_utils.group_ips_by_network(all_used_ips, [network_cidr], used_ip_values)[network_cidr]
+        
+        # Get available IPs
+        available = ip_utils.get_available_ips(network_cidr, used_ips, limit=limit)
+        
+        return jsonify({
+            "success": True,
+            "network": network_cidr,
+            "count": len(available),
+            "available_ips": available
+        }), 200
 
     @app.get("/infoblox/networks/<network_ref>/next-available-ip")
+    @_etagged
     def get_next_available_ip(network_ref: str) -> tuple:
         """
         Get the next available IP address in a network.
         Query params:
           - network: CIDR notation (e.g., 192.168.1.0/24)
         """
-        try:
-            network_cidr = request.args.get("network")
-            if not network_cidr:
-                return jsonify({
-                    "error": "Missing 'network' query parameter",
-                    "message": "Please provide network in CIDR notation (e.g., ?network=192.168.1.0/24)"
-                }), 400
-            
-            if not ip_utils.validate_network(network_cidr):
-                return jsonify({
-                    "error": "Invalid network CIDR",
-                    "message": "Network must be in CIDR notation (e.g., 192.168.1.0/24)"
-                }), 400
-            
-            # Get all used IPs from Infoblox for this network
-            host_records = infoblox_client.get_all_host_records()
-            fixed_addresses = infoblox_client.get_fixed_addresses()
-            
-            used_ips = []
-            
-            # Extract IPs from host records
-            for record in host_records:
-                if "ipv4addrs" in record:
-                    for ipv4 in record["ipv4addrs"]:
-                        if "ipv4addr" in ipv4:
-                            ip = ipv4["ipv4addr"]
-                            if ip_utils.ip_in_network(ip, network_cidr):
-                                used_ips.append(ip)
-            
-            # Extract IPs from fixed addresses
-            for fixed in fixed_addresses:
-                if "ipv4addr" in fixed:
-                    ip = fixed["ipv4addr"]
-                    if ip_utils.ip_in_network(ip, network_cidr):
-                        used_ips.append(ip)
-            
-            # Get next available IP
-            next_ip = ip_utils.get_next_available_ip(network_cidr, used_ips)
-            
-            if next_ip:
-                return jsonify({
-                    "success": True,
-                    "network": network_cidr,
-                    "next_available_ip": next_ip
-                }), 200
-            else:
-                return jsonify({
-                    "success": False,
-                    "network": network_cidr,
-                    "message": "No available IPs in this network"
-                }), 404
-            
-        except Exception as e:
-            logging.exception("Error fetching next available IP")
+        network_cidr = request.args.get("network")
+        if not network_cidr:
             return jsonify({
-                "error": str(e),
-                "message": "Failed to fetch next available IP"
-            }), 500
+                "error": "Missing 'network' query parameter",
+                "message": "Please provide network in CIDR notation (e.g., ?network=192.168.1.0/24)"
+            }), 400
+        
+        if not ip_utils.validate_network(network_cidr):
+            return jsonify({
+                "error": "Invalid network CIDR",
+                "message": "Network must be in CIDR notation (e.g., 192.168.1.0/24)"
+            }), 400
+        
+        # Scan the cached sorted integer index directly; no per-IP parsing
+        _, used_ip_values = fetch_used_ips()
+        next_ip = ip_utils.get_next_available_ip_int(network_cidr, used_ip_values)
+        
+        if next_ip:
+            return jsonify({
+                "success": True,
+                "network": network_cidr,
+                "next_available_ip": next_ip
+            }), 200
+        else:
+            return jsonify({
+                "success": False,
+                "network": network_cidr,
+                "message": "No available IPs in this network"
+            }), 404
 
     # WUG Device Management Endpoints
     
@@ -781,54 +1055,47 @@ def create_app() -> Flask:
           enable_monitoring?: boolean
         }
         """
-        try:
-            payload = request.get_json(silent=True) or {}
-            
-            # Validate required fields
-            display_name = payload.get("display_name")
-            ip_address = payload.get("ip_address")
-            
-            if not display_name or not ip_address:
-                return jsonify({
-                    "error": "Missing required fields",
-                    "message": "display_name and ip_address are required"
-                }), 400
-            
-            if not ip_utils.validate_ip(ip_address):
-                return jsonify({
-                    "error": "Invalid IP address",
-                    "message": "ip_address must be a valid IPv4 address"
-                }), 400
-            
-            # Check if device already exists
-            if wug_client.device_exists(ip_address):
-                return jsonify({
-                    "success": False,
-                    "message": f"Device with IP {ip_address} already exists in WUG"
-                }), 409
-            
-            # Create device in WUG
-            result = wug_client.create_device(
-                display_name=display_name,
-                ip_address=ip_address,
-                hostname=payload.get("hostname"),
-                device_type=payload.get("device_type", "Network Device"),
-                primary_role=payload.get("primary_role", "Device"),
-                poll_interval=payload.get("poll_interval", 60),
-                enable_monitoring=payload.get("enable_monitoring", True)
-            )
-            
-            if result.get("success"):
-                return jsonify(result), 201
-            else:
-                return jsonify(result), 400
-            
-        except Exception as e:
-            logging.exception("Error creating WUG device")
+        payload = _request_payload()
+        
+        # Validate required fields
+        display_name = payload.get("display_name")
+        ip_address = payload.get("ip_address")
+        
+        if not display_name or not ip_address:
             return jsonify({
-                "error": str(e),
-                "message": "Failed to create device in WUG"
-            }), 500
+                "error": "Missing required fields",
+                "message": "display_name and ip_address are required"
+            }), 400
+        
+        if not ip_utils.validate_ip(ip_address):
+            return jsonify({
+                "error": "Invalid IP address",
+                "message": "ip_address must be a valid IPv4 address"
+            }), 400
+        
+        # Check if device already exists
+        if wug_client.device_exists(ip_address):
+            return jsonify({
+                "success": False,
+                "message": f"Device with IP {ip_address} already exists in WUG"
+            }), 409
+        
+        # Create device in WUG
+        result = wug_client.create_device(
+            display_name=display_name,
+            ip_address=ip_address,
+            hostname=payload.get("hostname"),
+            device_type=payload.get("device_type", "Network Device"),
+            primary_role=payload.get("primary_role", "Device"),
+            poll_interval=payload.get("poll_interval", 60),
+            enable_monitoring=payload.get("enable_monitoring", True)
+        )
+        invalidate_caches()
+        
+        if result.get("success"):
+            return jsonify(result), 201
+        else:
+            return jsonify(result), 400
 
     # Combined Workflow Endpoints
     
@@ -845,127 +1112,145 @@ def create_app() -> Flask:
           enable_monitoring?: boolean (default: true)
         }
         """
-        try:
-            payload = request.get_json(silent=True) or {}
-            
-            # Validate required fields
-            hostname = payload.get("hostname")
-            ip_address = payload.get("ip_address")
-            network_cidr = payload.get("network")
-            
-            if not hostname or not ip_address:
+        payload = _request_payload()
+        
+        # Validate required fields
+        hostname = payload.get("hostname")
+        ip_address = payload.get("ip_address")
+        network_cidr = payload.get("network")
+        
+        if not hostname or not ip_address:
+            return jsonify({
+                "error": "Missing required fields",
+                "message": "hostname and ip_address are required"
+            }), 400
+        
+        if not ip_utils.validate_ip(ip_address):
+            return jsonify({
+                "error": "Invalid IP address",
+                "message": "ip_address must be a valid IPv4 address"
+            }), 400
+        
+        # Validate IP is in network if network is provided
+        if network_cidr:
+            if not ip_utils.validate_network(network_cidr):
                 return jsonify({
-                    "error": "Missing required fields",
-                    "message": "hostname and ip_address are required"
+                    "error": "Invalid network CIDR",
+                    "message": "network must be in CIDR notation (e.g., 192.168.1.0/24)"
                 }), 400
             
-            if not ip_utils.validate_ip(ip_address):
+            if not ip_utils.ip_in_network(ip_address, network_cidr):
                 return jsonify({
-                    "error": "Invalid IP address",
-                    "message": "ip_address must be a valid IPv4 address"
+                    "error": "IP not in network",
+                    "message": f"IP {ip_address} is not in network {network_cidr}"
                 }), 400
+        
+        results = {
+            "infoblox": None,
+            "wug": None
+        }
+        
+        # Add to Infoblox
+        try:
+            host_record = InfobloxHostRecord(
+                fqdn=hostname,
+                ip_address=ip_address,
+                network_view=settings.infoblox_network_view,
+                extattrs={"Comment": {"value": payload.get("comment", f"Added via combined workflow")}}
+            )
             
-            # Validate IP is in network if network is provided
-            if network_cidr:
-                if not ip_utils.validate_network(network_cidr):
-                    return jsonify({
-                        "error": "Invalid network CIDR",
-                        "message": "network must be in CIDR notation (e.g., 192.168.1.0/24)"
-                    }), 400
-                
-                if not ip_utils.ip_in_network(ip_address, network_cidr):
-                    return jsonify({
-                        "error": "IP not in network",
-                        "message": f"IP {ip_address} is not in network {network_cidr}"
-                    }), 400
-            
-            results = {
-                "infoblox": None,
-                "wug": None
+            infoblox_result = infoblox_client.upsert_host_record(host_record, dry_run=False)
+            results["infoblox"] = {
+                "success": True,
+                "action": infoblox_result.get("action", "created"),
+                "hostname": hostname,
+                "ip_address": ip_address
             }
-            
-            # Add to Infoblox
+        except Exception as e:
+            results["infoblox"] = {
+                "success": False,
+                "error": str(e)
+            }
+            # If Infoblox fails, still try WUG if requested
+        
+        # Optionally add to WUG
+        add_to_wug = payload.get("add_to_wug", False)
+        if add_to_wug:
             try:
-                host_record = InfobloxHostRecord(
-                    fqdn=hostname,
-                    ip_address=ip_address,
-                    network_view=settings.infoblox_network_view,
-                    extattrs={"Comment": {"value": payload.get("comment", f"Added via combined workflow")}}
-                )
-                
-                infoblox_result = infoblox_client.upsert_host_record(host_record, dry_run=False)
-                results["infoblox"] = {
-                    "success": True,
-                    "action": infoblox_result.get("action", "created"),
-                    "hostname": hostname,
-                    "ip_address": ip_address
-                }
-            except Exception as e:
-                results["infoblox"] = {
-                    "success": False,
-                    "error": str(e)
-                }
-                # If Infoblox fails, still try WUG if requested
-            
-            # Optionally add to WUG
-            add_to_wug = payload.get("add_to_wug", False)
-            if add_to_wug:
-                try:
-                    # Check if device already exists
-                    if wug_client.device_exists(ip_address):
-                        results["wug"] = {
-                            "success": False,
-                            "message": f"Device with IP {ip_address} already exists in WUG",
-                            "skipped": True
-                        }
-                    else:
-                        wug_result = wug_client.create_device(
-                            display_name=hostname,
-                            ip_address=ip_address,
-                            hostname=hostname,
-                            enable_monitoring=payload.get("enable_monitoring", True)
-                        )
-                        results["wug"] = wug_result
-                except Exception as e:
+                # Check if device already exists
+                if wug_client.device_exists(ip_address):
                     results["wug"] = {
                         "success": False,
-                        "error": str(e)
+                        "message": f"Device with IP {ip_address} already exists in WUG",
+                        "skipped": True
                     }
-            else:
+                else:
+                    wug_result = wug_client.create_device(
+                        display_name=hostname,
+                        ip_address=ip_address,
+                        hostname=hostname,
+                        enable_monitoring=payload.get("enable_monitoring", True)
+                    )
+                    results["wug"] = wug_result
+            except Exception as e:
                 results["wug"] = {
-                    "skipped": True,
-                    "message": "WUG creation not requested (add_to_wug=false)"
+                    "success": False,
+                    "error": str(e)
                 }
-            
-            # Determine overall success
-            infoblox_success = results["infoblox"] and results["infoblox"].get("success", False)
-            wug_success = (
-                not add_to_wug or 
-                (results["wug"] and (results["wug"].get("success", False) or results["wug"].get("skipped", False)))
-            )
-            
-            overall_success = infoblox_success and wug_success
-            status_code = 201 if overall_success else 207  # 207 = Multi-Status
-            
-            return jsonify({
-                "success": overall_success,
-                "results": results
-            }), status_code
-            
-        except Exception as e:
-            logging.exception("Error in combined add device")
-            return jsonify({
-                "error": str(e),
-                "message": "Failed to add device"
-            }), 500
+        else:
+            results["wug"] = {
+                "skipped": True,
+                "message": "WUG creation not requested (add_to_wug=false)"
+            }
+        
+        # Determine overall success
+        infoblox_success = results["infoblox"] and results["infoblox"].get("success", False)
+        wug_success = (
+            not add_to_wug or 
+            (results["wug"] and (results["wug"].get("success", False) or results["wug"].get("skipped", False)))
+        )
+        
+        overall_success = infoblox_success and wug_success
+        status_code = 201 if overall_success else 207  # 207 = Multi-Status
+        invalidate_caches()
+        
+        return jsonify({
+            "success": overall_success,
+            "results": results
+        }), status_code
 
     return app
 
 
 def main() -> None:
-    app = create_app()
-    settings = load_settings()
-    app.run(host=settings.flask_host, port=settings.flask_port)
+    """Serve the app under gunicorn, or the Flask dev server when FLASK_DEBUG is set."""
+    settings = _settings()
+    if settings.flask_debug:
+        create_app().run(host=settings.flask_host, port=settings.flask_port, debug=True)
+        return
+
+    from gunicorn.app.base import BaseApplication
+
+    from . import gunicorn_conf
+
+    class StandaloneApplication(BaseApplication):
+        def __init__(self, app: Flask, options: dict[str, Any]):
+            self.application = app
+            self.options = options
+            super().__init__()
+
+        def load_config(self) -> None:
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Flask:
+            return self.application
+
+    options = {
+        key: getattr(gunicorn_conf, key)
+        for key in ("bind", "workers", "worker_class", "threads", "keepalive", "timeout", "loglevel")
+    }
+    StandaloneApplication(create_app(), options).run()
 
 
 if __name__ == "__main__":
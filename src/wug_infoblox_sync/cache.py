@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe in-process cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 16):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        # Fills in progress, so concurrent misses on a key share one factory call
+        self._inflight: dict[Hashable, Future] = {}
+        # Bumped by pop/clear so a fill that started before an invalidation is not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._get_locked(key, default)
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by pop/clear; pass it to set() to drop a fill that raced one."""
+        with self._lock:
+            return self._generation
+
+    def set(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        """Store value, unless generation is given and the cache was invalidated since."""
+        with self._lock:
+            if generation is None or generation == self._generation:
+                self._set_locked(key, value)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling factory to fill a miss.
+        Callers that miss while another caller is filling the same key wait
+        for that result instead of calling factory themselves.
+        """
+        with self._lock:
+            value = self._get_locked(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = Future()
+                generation = self._generation
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            return future.result()
+
+        try:
+            value = factory()
+        except BaseException as exc:
+            with self._lock:
+                self._finish_locked(key, future)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            if generation == self._generation:
+                self._set_locked(key, value)
+            self._finish_locked(key, future)
+        future.set_result(value)
+        return value
+
+    def update(self, key: Hashable, fn: Callable[[Any], Any]) -> None:
+        """
+        Replace a live entry with fn(value) under the cache lock, keeping its
+        expiry. Nothing happens when key has no live entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() >= entry[0]:
+                return
+            self._entries[key] = (entry[0], fn(entry[1]))
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._inflight.pop(key, None)
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+            self._generation += 1
+
+    def _get_locked(self, key: Hashable, default: Any) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return default
+        return value
+
+    def _set_locked(self, key: Hashable, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        if key not in self._entries and len(self._entries) >= self.maxsize:
+            self._evict()
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def _finish_locked(self, key: Hashable, future: Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def _evict(self) -> None:
+        # Drop expired entries first, then the oldest if still full
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._entries.items() if now >= expires_at]:
+            del self._entries[key]
+        if len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
@@ -1,18 +1,24 @@
 from dataclasses import dataclass
 import os
+import tempfile
 
 
 @dataclass(frozen=True)
 class Settings:
     flask_host: str
     flask_port: int
+    flask_debug: bool
     sync_timeout_seconds: int
     sync_verify_ssl: bool
     sync_log_level: str
+    sync_workers: int
+    cache_ttl_seconds: float
+    sync_job_dir: str
     wug_base_url: str
     wug_username: str
     wug_password: str
     wug_token_endpoint: str
+    wug_requests_per_second: float
     infoblox_base_url: str
     infoblox_wapi_version: str
     infoblox_username: str
@@ -31,13 +37,20 @@ def load_settings() -> Settings:
     return Settings(
         flask_host=os.getenv("FLASK_HOST", "0.0.0.0"),
         flask_port=int(os.getenv("FLASK_PORT", "8080")),
+        flask_debug=_as_bool(os.getenv("FLASK_DEBUG", "false"), False),
         sync_timeout_seconds=int(os.getenv("SYNC_TIMEOUT_SECONDS", "30")),
         sync_verify_ssl=_as_bool(os.getenv("SYNC_VERIFY_SSL", "false"), False),
         sync_log_level=os.getenv("SYNC_LOG_LEVEL", "INFO"),
+        sync_workers=int(os.getenv("SYNC_WORKERS", "16")),
+        cache_ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS", "5")),
+        sync_job_dir=os.getenv(
+            "SYNC_JOB_DIR", os.path.join(tempfile.gettempdir(), "wug-infoblox-sync-jobs")
+        ),
         wug_base_url=os.getenv("WUG_BASE_URL", ""),
         wug_username=os.getenv("WUG_USERNAME", ""),
         wug_password=os.getenv("WUG_PASSWORD", ""),
         wug_token_endpoint=os.getenv("WUG_TOKEN_ENDPOINT", "/api/v1/token"),
+        wug_requests_per_second=float(os.getenv("WUG_REQUESTS_PER_SECOND", "0")),
         infoblox_base_url=os.getenv("INFOBLOX_BASE_URL", ""),
         infoblox_wapi_version=os.getenv("INFOBLOX_WAPI_VERSION", "v2.12.3"),
         infoblox_username=os.getenv("INFOBLOX_USERNAME", ""),
@@ -0,0 +1,25 @@
+"""Gunicorn settings for serving the sync API.
+
+Usage: gunicorn -c python:wug_infoblox_sync.gunicorn_conf 'wug_infoblox_sync.app:create_app()'
+"""
+
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+from wug_infoblox_sync.config import load_settings
+
+load_dotenv()
+_settings = load_settings()
+
+bind = f"{_settings.flask_host}:{_settings.flask_port}"
+workers = 2 * multiprocessing.cpu_count() + 1
+# gthread already lets a worker serve other requests while one waits on
+# WUG/Infoblox; set GUNICORN_WORKER_CLASS=gevent (with gevent installed)
+# to trade threads for greenlets
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+keepalive = 30
+timeout = 300
+loglevel = _settings.sync_log_level.lower()
@@ -1,34 +1,67 @@
 from __future__ import annotations
 
-from typing import Any
+import atexit
+import math
+from typing import Any, Iterator
+from urllib.parse import urlencode
+import orjson
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
+from .cache import TTLCache
 from .config import Settings
 from .models import InfobloxHostRecord
+from .transport import build_session
+
+
+# Request bodies are serialized with orjson and sent as data=, so the type is set explicitly
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Host records requested per WAPI page
+HOST_PAGE_SIZE = 1000
+
+# Return fields for record:host lookups before an upsert and for listings
+_HOST_UPSERT_RETURN_FIELDS = "_ref,name,ipv4addrs,extattrs"
+_HOST_LIST_RETURN_FIELDS = "name,ipv4addrs,extattrs,comment"
+
+# Return fields for the read-only list endpoints, keyed by WAPI object type
+_LIST_RETURN_FIELDS = {
+    "networkview": "name,is_default,comment",
+    "network": "network,network_view,comment,extattrs",
+    "networkcontainer": "network,network_view,comment,extattrs",
+    "fixedaddress": "ipv4addr,network,network_view,mac,comment,extattrs",
+    "range": "start_addr,end_addr,network,network_view,comment,extattrs",
+    "record:cname": "name,canonical,zone,comment",
+    "sharednetwork": "name,network_view,networks,comment",
+}
 
 
 class InfobloxClient:
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, session: requests.Session | None = None):
+        """
+        Args:
+            settings: Service settings
+            session: Session to send requests through; defaults to a new
+                transport.build_session(). Basic auth is set on it, so it
+                should not be shared with other clients.
+        """
         self.settings = settings
-        self.session = requests.Session()
+        self.session = build_session(settings.sync_workers) if session is None else session
         self.session.auth = (settings.infoblox_username, settings.infoblox_password)
-        retry = Retry(
-            total=3,
-            connect=3,
-            read=3,
-            status=3,
-            backoff_factor=0.5,
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=("GET", "POST", "PUT", "PATCH", "DELETE"),
-        )
-        adapter = HTTPAdapter(max_retries=retry)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        atexit.register(self.close)
+        # (ETag, result) of the last single-page host-record query per limit
+        self._etag_cache = TTLCache(math.inf, maxsize=32)
+        self._wapi_base_url = f"{settings.infoblox_base_url.rstrip('/')}/wapi/{settings.infoblox_wapi_version}"
+        self._host_url = f"{self._wapi_base_url}/record:host"
+        self._request_url = f"{self._wapi_base_url}/request"
+        # Full URLs, query string included, for the fixed list queries
+        self._list_urls = {
+            wapi_object: f"{self._wapi_base_url}/{wapi_object}?{urlencode({'_return_fields': fields})}"
+            for wapi_object, fields in _LIST_RETURN_FIELDS.items()
+        }
 
-    def _wapi_base(self) -> str:
-        return f"{self.settings.infoblox_base_url.rstrip('/')}/wapi/{self.settings.infoblox_wapi_version}"
+    def close(self) -> None:
+        """Release pooled keep-alive connections."""
+        self.session.close()
 
     def upsert_host_record(self, record: InfobloxHostRecord, dry_run: bool) -> dict[str, Any]:
         if dry_run:
@@ -39,10 +72,10 @@ class InfobloxClient:
                 "ip_address": record.ip_address,
             }
 
-        query_url = f"{self._wapi_base()}/record:host"
+        query_url = self._host_url
         query_params = {
             "name": record.fqdn,
-            "_return_fields": "_ref,name,ipv4addrs,extattrs",
+            "_return_fields": _HOST_UPSERT_RETURN_FIELDS,
         }
         query_response = self.session.get(
             query_url,
@@ -51,23 +84,19 @@ class InfobloxClient:
             verify=self.settings.sync_verify_ssl,
         )
         query_response.raise_for_status()
-        existing = query_response.json()
+        existing = orjson.loads(query_response.content)
 
-        payload = {
-            "name": record.fqdn,
-            "ipv4addrs": [{"ipv4addr": record.ip_address}],
-            "extattrs": record.extattrs,
-            "view": record.network_view,
-        }
+        payload = self._host_payload(record)
 
         if isinstance(existing, list) and existing:
             ref = existing[0].get("_ref")
             if not ref:
                 raise RuntimeError(f"Infoblox returned existing record without _ref for {record.fqdn}")
-            update_url = f"{self._wapi_base()}/{ref}"
+            update_url = f"{self._wapi_base_url}/{ref}"
             update_response = self.session.put(
                 update_url,
-                json=payload,
+                data=orjson.dumps(payload),
+                headers=_JSON_HEADERS,
                 timeout=self.settings.sync_timeout_seconds,
                 verify=self.settings.sync_verify_ssl,
             )
@@ -81,7 +110,8 @@ class InfobloxClient:
 
         create_response = self.session.post(
             query_url,
-            json=payload,
+            data=orjson.dumps(payload),
+            headers=_JSON_HEADERS,
             timeout=self.settings.sync_timeout_seconds,
             verify=self.settings.sync_verify_ssl,
         )
@@ -91,60 +121,237 @@ class InfobloxClient:
             "action": "created",
             "fqdn": record.fqdn,
             "ip_address": record.ip_address,
-            "ref": create_response.json(),
+            "ref": orjson.loads(create_response.content),
         }
 
-    def get_all_host_records(self, limit: int | None = None) -> list[dict[str, Any]]:
+    @staticmethod
+    def _host_payload(record: InfobloxHostRecord) -> dict[str, Any]:
+        return {
+            "name": record.fqdn,
+            "ipv4addrs": [{"ipv4addr": record.ip_address}],
+            "extattrs": record.extattrs,
+            "view": record.network_view,
+        }
+
+    def bulk_upsert_host_records(self, records: list[InfobloxHostRecord]) -> list[dict[str, Any]]:
         """
-        Get all host records from Infoblox.
+        Create or update many host records through the WAPI multi-object request endpoint.
+        
+        Existing records are looked up in one request and all writes are sent in a
+        second, so a batch costs two round-trips regardless of its size. WAPI runs
+        each request as a single transaction.
+        
+        Only the last record for each FQDN is written, as a sequential upsert would
+        leave it; two creates of one name would fail the whole transaction.
         
         Args:
-            limit: Optional limit on number of records to return
+            records: Host records to upsert
             
         Returns:
-            List of host record dictionaries with name and ipv4addrs
+            One result per record, in the same shape as upsert_host_record; records
+            replaced by a later one with the same FQDN get action "superseded"
         """
-        query_url = f"{self._wapi_base()}/record:host"
-        query_params = {
-            "_return_fields": "name,ipv4addrs,extattrs,comment",
-            "_max_results": limit if limit else 1000,
-        }
-        
-        response = self.session.get(
-            query_url,
-            params=query_params,
+        if not records:
+            return []
+
+        last_index = {record.fqdn: index for index, record in enumerate(records)}
+        written = [record for index, record in enumerate(records) if last_index[record.fqdn] == index]
+
+        request_url = self._request_url
+        lookups = [
+            {
+                "method": "GET",
+                "object": "record:host",
+                "data": {"name": record.fqdn},
+                "args": {"_return_fields": "_ref"},
+            }
+            for record in written
+        ]
+        lookup_response = self.session.post(
+            request_url,
+            data=orjson.dumps(lookups),
+            headers=_JSON_HEADERS,
             timeout=self.settings.sync_timeout_seconds,
             verify=self.settings.sync_verify_ssl,
         )
-        response.raise_for_status()
-        records = response.json()
+        lookup_response.raise_for_status()
+        existing = orjson.loads(lookup_response.content)
+
+        writes = []
+        for record, matches in zip(written, existing):
+            payload = self._host_payload(record)
+            ref = matches[0].get("_ref") if isinstance(matches, list) and matches else None
+            if ref:
+                writes.append({"method": "PUT", "object": ref, "data": payload})
+            else:
+                writes.append({"method": "POST", "object": "record:host", "data": payload})
+
+        write_response = self.session.post(
+            request_url,
+            data=orjson.dumps(writes),
+            headers=_JSON_HEADERS,
+            timeout=self.settings.sync_timeout_seconds,
+            verify=self.settings.sync_verify_ssl,
+        )
+        write_response.raise_for_status()
+        refs = orjson.loads(write_response.content)
+
+        results_by_fqdn = {}
+        for record, write, ref in zip(written, writes, refs):
+            result = {
+                "changed": True,
+                "action": "updated" if write["method"] == "PUT" else "created",
+                "fqdn": record.fqdn,
+                "ip_address": record.ip_address,
+            }
+            if write["method"] == "POST":
+                result["ref"] = ref
+            results_by_fqdn[record.fqdn] = result
+
+        return [
+            results_by_fqdn[record.fqdn] if last_index[record.fqdn] == index else {
+                "changed": False,
+                "action": "superseded",
+                "fqdn": record.fqdn,
+                "ip_address": record.ip_address,
+                "reason": "A later device in the sync maps to the same FQDN",
+            }
+            for index, record in enumerate(records)
+        ]
+
+    def get_all_host_records(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """
+        Get all host records from Infoblox.
         
-        if not isinstance(records, list):
-            return []
+        A result that came from a single page is kept with that page's ETag and
+        revalidated with If-None-Match on the next call; a 304 reuses it without
+        downloading or transforming anything.
         
-        # Transform records to simpler format
-        result = []
-        for record in records:
-            if not isinstance(record, dict):
-                continue
+        Args:
+            limit: Optional limit on number of records to return (all records if omitted)
             
-            name = record.get("name", "")
-            ipv4addrs = record.get("ipv4addrs", [])
+        Returns:
+            List of host record dictionaries with hostname, ip_address, extattrs and comment
+        """
+        cache_key = ("record:host", limit)
+        cached = self._etag_cache.get(cache_key)
+        hosts: list[dict[str, Any]] = []
+        first_etag = None
+        page_count = 0
+        
+        for response, page in self._host_record_pages(limit=limit, etag=cached[0] if cached else None):
+            if page is None:
+                return list(cached[1])
+            if not page_count:
+                first_etag = response.headers.get("ETag")
+            page_count += 1
+            hosts.extend(self._simplify_host_records(page, limit and limit - len(hosts)))
+            if limit and len(hosts) >= limit:
+                break
+        
+        # Later pages are fetched by page id and cannot be revalidated
+        if page_count == 1 and first_etag:
+            self._etag_cache.set(cache_key, (first_etag, hosts))
+            return list(hosts)
+        return hosts
+
+    def iter_host_records(self, page_size: int = HOST_PAGE_SIZE, limit: int | None = None) -> Iterator[dict[str, Any]]:
+        """
+        Yield host records page by page using WAPI result paging.
+        
+        Args:
+            page_size: Records requested per page
+            limit: Optional limit on number of records to yield
             
-            # Get first IP address
-            ip_address = ""
-            if ipv4addrs and isinstance(ipv4addrs, list) and len(ipv4addrs) > 0:
-                ip_address = ipv4addrs[0].get("ipv4addr", "")
+        Yields:
+            Host record dictionaries in the same format as get_all_host_records
+        """
+        count = 0
+        for _, page in self._host_record_pages(page_size, limit):
+            for host in self._simplify_host_records(page, limit and limit - count):
+                yield host
+                count += 1
+            if limit and count >= limit:
+                return
+
+    def _host_record_pages(
+        self,
+        page_size: int = HOST_PAGE_SIZE,
+        limit: int | None = None,
+        etag: str | None = None,
+    ) -> Iterator[tuple[requests.Response, dict[str, Any] | None]]:
+        """
+        Yield (response, page) for each WAPI page of host records.
+        
+        When etag is given it is sent as If-None-Match on the first request; a
+        304 reply yields a None page and ends paging.
+        """
+        query_url = self._host_url
+        query_params: dict[str, Any] = {
+            "_return_fields": _HOST_LIST_RETURN_FIELDS,
+            "_paging": 1,
+            "_return_as_object": 1,
+            # No point fetching a full page when fewer records are wanted
+            "_max_results": min(page_size, limit) if limit else page_size,
+        }
+        headers = {"If-None-Match": etag} if etag else None
+        
+        while True:
+            response = self.session.get(
+                query_url,
+                params=query_params,
+                headers=headers,
+                timeout=self.settings.sync_timeout_seconds,
+                verify=self.settings.sync_verify_ssl,
+            )
+            if etag and response.status_code == 304:
+                yield response, None
+                return
+            response.raise_for_status()
+            # Parse the raw bytes directly; response.json() would first decode
+            # the whole page into a str and then parse it with stdlib json
+            page = orjson.loads(response.content)
+            yield response, page
             
-            if name and ip_address:
-                result.append({
-                    "hostname": name,
-                    "ip_address": ip_address,
-                    "extattrs": record.get("extattrs", {}),
-                    "comment": record.get("comment", ""),
-                })
+            next_page_id = page.get("next_page_id")
+            if not next_page_id:
+                return
+            query_params = {"_page_id": next_page_id}
+            headers = None
+
+    def _simplify_host_records(self, page: dict[str, Any], limit: int | None = None) -> list[dict[str, Any]]:
+        """Simplify the records of one page, keeping at most limit of them."""
+        hosts = []
+        for record in page.get("result", []):
+            host = self._simplify_host_record(record)
+            if host:
+                hosts.append(host)
+                if limit and len(hosts) >= limit:
+                    break
+        return hosts
+
+    @staticmethod
+    def _simplify_host_record(record: Any) -> dict[str, Any] | None:
+        """Reduce a WAPI host record to hostname, first IP, extattrs and comment."""
+        if not isinstance(record, dict):
+            return None
         
-        return result
+        name = record.get("name", "")
+        ipv4addrs = record.get("ipv4addrs", [])
+        
+        # Get first IP address
+        ip_address = ""
+        if ipv4addrs and isinstance(ipv4addrs, list) and len(ipv4addrs) > 0:
+            ip_address = ipv4addrs[0].get("ipv4addr", "")
+        
+        if not name or not ip_address:
+            return None
+        return {
+            "hostname": name,
+            "ip_address": ip_address,
+            "extattrs": record.get("extattrs", {}),
+            "comment": record.get("comment", ""),
+        }
 
     def delete_host_record(self, hostname: str) -> dict[str, Any]:
         """
@@ -157,7 +364,7 @@ class InfobloxClient:
             Dictionary with deletion result
         """
         # First find the record to get its _ref
-        query_url = f"{self._wapi_base()}/record:host"
+        query_url = self._host_url
         query_params = {
             "name": hostname,
             "_return_fields": "_ref,name",
@@ -170,7 +377,7 @@ class InfobloxClient:
             verify=self.settings.sync_verify_ssl,
         )
         query_response.raise_for_status()
-        existing = query_response.json()
+        existing = orjson.loads(query_response.content)
         
         if not isinstance(existing, list) or not existing:
             return {
@@ -187,7 +394,7 @@ class InfobloxClient:
             }
         
         # Delete the record
-        delete_url = f"{self._wapi_base()}/{ref}"
+        delete_url = f"{self._wapi_base_url}/{ref}"
         delete_response = self.session.delete(
             delete_url,
             timeout=self.settings.sync_timeout_seconds,
@@ -202,93 +409,46 @@ class InfobloxClient:
             "ref": ref,
         }
 
-    def get_network_views(self) -> list[dict[str, Any]]:
-        """Get all network views from Infoblox"""
-        url = f"{self._wapi_base()}/networkview"
+    def _get_list(self, wapi_object: str) -> list[dict[str, Any]]:
         response = self.session.get(
-            url,
-            params={"_return_fields": "name,is_default,comment"},
+            self._list_urls[wapi_object],
             timeout=self.settings.sync_timeout_seconds,
             verify=self.settings.sync_verify_ssl,
         )
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
+
+    def get_network_views(self) -> list[dict[str, Any]]:
+        """Get all network views from Infoblox"""
+        return self._get_list("networkview")
 
     def get_ipv4_networks(self) -> list[dict[str, Any]]:
         """Get all IPv4 networks from Infoblox"""
-        url = f"{self._wapi_base()}/network"
-        response = self.session.get(
-            url,
-            params={"_return_fields": "network,network_view,comment,extattrs"},
-            timeout=self.settings.sync_timeout_seconds,
-            verify=self.settings.sync_verify_ssl,
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get_list("network")
 
     def get_ipv4_network_containers(self) -> list[dict[str, Any]]:
         """Get all IPv4 network containers from Infoblox"""
-        url = f"{self._wapi_base()}/networkcontainer"
-        response = self.session.get(
-            url,
-            params={"_return_fields": "network,network_view,comment,extattrs"},
-            timeout=self.settings.sync_timeout_seconds,
-            verify=self.settings.sync_verify_ssl,
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get_list("networkcontainer")
 
     def get_fixed_addresses(self) -> list[dict[str, Any]]:
         """Get all IPv4 fixed addresses from Infoblox"""
-        url = f"{self._wapi_base()}/fixedaddress"
-        response = self.session.get(
-            url,
-            params={"_return_fields": "ipv4addr,network,network_view,mac,comment,extattrs"},
-            timeout=self.settings.sync_timeout_seconds,
-            verify=self.settings.sync_verify_ssl,
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get_list("fixedaddress")
 
     def get_ipv4_ranges(self) -> list[dict[str, Any]]:
         """Get all IPv4 ranges from Infoblox"""
-        url = f"{self._wapi_base()}/range"
-        response = self.session.get(
-            url,
-            params={"_return_fields": "start_addr,end_addr,network,network_view,comment,extattrs"},
-            timeout=self.settings.sync_timeout_seconds,
-            verify=self.settings.sync_verify_ssl,
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get_list("range")
 
     def get_alias_records(self) -> list[dict[str, Any]]:
         """Get all CNAME (alias) records from Infoblox"""
-        url = f"{self._wapi_base()}/record:cname"
-        response = self.session.get(
-            url,
-            params={"_return_fields": "name,canonical,zone,comment"},
-            timeout=self.settings.sync_timeout_seconds,
-            verify=self.settings.sync_verify_ssl,
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get_list("record:cname")
 
     def get_ipv4_shared_networks(self) -> list[dict[str, Any]]:
         """Get all IPv4 shared networks from Infoblox"""
-        url = f"{self._wapi_base()}/sharednetwork"
-        response = self.session.get(
-            url,
-            params={"_return_fields": "name,network_view,networks,comment"},
-            timeout=self.settings.sync_timeout_seconds,
-            verify=self.settings.sync_verify_ssl,
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get_list("sharednetwork")
 
     def create_network(self, network_cidr: str, comment: str = "", network_view: str = "default") -> dict[str, Any]:
         """Create a new IPv4 network in Infoblox"""
-        url = f"{self._wapi_base()}/network"
+        url = f"{self._wapi_base_url}/network"
         payload = {
             "network": network_cidr,
             "network_view": network_view
@@ -298,14 +458,15 @@ class InfobloxClient:
         
         response = self.session.post(
             url,
-            json=payload,
+            data=orjson.dumps(payload),
+            headers=_JSON_HEADERS,
             timeout=self.settings.sync_timeout_seconds,
             verify=self.settings.sync_verify_ssl,
         )
         response.raise_for_status()
         return {
             "success": True,
-            "ref": response.json(),
+            "ref": orjson.loads(response.content),
             "network": network_cidr,
             "comment": comment
         }
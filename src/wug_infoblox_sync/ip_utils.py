@@ -3,27 +3,56 @@ IP address utilities for calculating network space, availability, and utilizatio
 """
 
 import ipaddress
-from typing import Any
+import re
+import socket
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, Iterator, Sequence
 
+# Dotted-quad IPv4 with each octet 0-255 and no leading zeros, as IPv4Address accepts
+_OCTET = r"(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+_IPV4_RE = re.compile(rf"{_OCTET}(?:\.{_OCTET}){{3}}")
 
+
+@lru_cache(maxsize=4096)
 def parse_network(network_cidr: str) -> ipaddress.IPv4Network:
-    """Parse CIDR notation into IPv4Network object."""
+    """Parse CIDR notation into IPv4Network object (cached per CIDR string)."""
     return ipaddress.IPv4Network(network_cidr, strict=False)
 
 
-def get_usable_ips(network_cidr: str) -> list[str]:
+@lru_cache(maxsize=4096)
+def network_ints(network_cidr: str) -> tuple[int, int, int]:
+    """Network address, broadcast address and netmask of a CIDR as integers (cached)."""
+    network = parse_network(network_cidr)
+    return int(network.network_address), int(network.broadcast_address), int(network.netmask)
+
+
+def _host_range(network_cidr: str) -> tuple[int, int]:
+    """First and last usable host addresses as integers, matching network.hosts()."""
+    first, last, _ = network_ints(network_cidr)
+    # /31 and /32 have no separate network and broadcast addresses
+    if last - first < 2:
+        return first, last
+    return first + 1, last - 1
+
+
+def get_usable_ips(network_cidr: str) -> Iterator[str]:
     """
-    Get list of usable IP addresses in a network (excluding network and broadcast).
+    Iterate usable IP addresses in a network (excluding network and broadcast).
+    
+    Addresses are produced lazily, so taking a prefix of a large network does
+    not build every address. Use get_total_ips for the count.
     
     Args:
         network_cidr: Network in CIDR notation (e.g., "192.168.1.0/24")
         
     Returns:
-        List of usable IP addresses as strings
+        Iterator of usable IP addresses as strings
     """
-    network = parse_network(network_cidr)
-    # Exclude network address and broadcast address
-    return [str(ip) for ip in list(network.hosts())]
+    first_host, last_host = _host_range(network_cidr)
+    return (str(ipaddress.IPv4Address(ip)) for ip in range(first_host, last_host + 1))
 
 
 def get_total_ips(network_cidr: str) -> int:
@@ -49,22 +78,39 @@ def calculate_utilization(
     
     Args:
         network_cidr: Network in CIDR notation
-        used_ips: List of IP addresses currently in use
+        used_ips: List of IP addresses currently in use (unparseable entries are ignored)
         
     Returns:
         Dictionary with utilization statistics
     """
+    network_int, _, mask = network_ints(network_cidr)
+    
+    # Count used IPs in this network by masking their integer form
+    used_count = 0
+    for ip in used_ips:
+        try:
+            if (ip_to_int(ip) & mask) == network_int:
+                used_count += 1
+        except ValueError:
+            continue
+    
+    return utilization_for_count(network_cidr, used_count)
+
+
+def utilization_for_count(network_cidr: str, used_count: int) -> dict[str, Any]:
+    """
+    Calculate IP utilization for a network from an already known used-IP count.
+    
+    Args:
+        network_cidr: Network in CIDR notation
+        used_count: Number of IPs in use inside the network
+        
+    Returns:
+        Dictionary with utilization statistics, as calculate_utilization
+    """
     network = parse_network(network_cidr)
     total_ips = network.num_addresses - 2  # Exclude network and broadcast
     
-    # Filter used IPs to only those in this network
-    network_obj = ipaddress.IPv4Network(network_cidr, strict=False)
-    valid_used_ips = [
-        ip for ip in used_ips 
-        if ipaddress.IPv4Address(ip) in network_obj
-    ]
-    
-    used_count = len(valid_used_ips)
     available_count = total_ips - used_count
     utilization_percent = (used_count / total_ips * 100) if total_ips > 0 else 0
     
@@ -81,6 +127,37 @@ def calculate_utilization(
     }
 
 
+def iter_available_ips(
+    network_cidr: str, 
+    used_ips: Iterable[str]
+) -> Iterator[str]:
+    """
+    Yield available IP addresses in a network in address order.
+    
+    Host addresses are walked as integers, so only the addresses actually
+    consumed are ever converted to strings.
+    
+    Args:
+        network_cidr: Network in CIDR notation
+        used_ips: IP addresses currently in use (unparseable entries are ignored)
+        
+    Yields:
+        Available IP addresses
+    """
+    first_host, last_host = _host_range(network_cidr)
+    
+    used = set()
+    for ip in used_ips:
+        try:
+            used.add(ip_to_int(ip))
+        except ValueError:
+            continue
+    
+    for candidate in range(first_host, last_host + 1):
+        if candidate not in used:
+            yield str(ipaddress.IPv4Address(candidate))
+
+
 def get_available_ips(
     network_cidr: str, 
     used_ips: list[str],
@@ -92,18 +169,12 @@ def get_available_ips(
     Args:
         network_cidr: Network in CIDR notation
         used_ips: List of IP addresses currently in use
-        limit: Maximum number of IPs to return (optional)
+        limit: Maximum number of IPs to return; 0 or None for all. Must not be negative
         
     Returns:
         List of available IP addresses
     """
-    usable_ips = set(get_usable_ips(network_cidr))
-    used_set = set(used_ips)
-    available = sorted(usable_ips - used_set, key=lambda ip: ipaddress.IPv4Address(ip))
-    
-    if limit:
-        return available[:limit]
-    return available
+    return list(islice(iter_available_ips(network_cidr, used_ips), limit or None))
 
 
 def get_next_available_ip(
@@ -120,8 +191,34 @@ def get_next_available_ip(
     Returns:
         Next available IP address or None if network is full
     """
-    available = get_available_ips(network_cidr, used_ips, limit=1)
-    return available[0] if available else None
+    return next(iter_available_ips(network_cidr, used_ips), None)
+
+
+def get_next_available_ip_int(
+    network_cidr: str, 
+    used_values: Sequence[int]
+) -> str | None:
+    """
+    Get the next available IP address in a network from sorted integer used IPs.
+    
+    Args:
+        network_cidr: Network in CIDR notation
+        used_values: Integer values of all used IPs in ascending order, such as
+            the values returned by index_ips (IPs outside the network are fine)
+        
+    Returns:
+        Next available IP address or None if network is full
+    """
+    first_host, last_host = _host_range(network_cidr)
+    
+    # Used values from first_host upward are sorted, so the first free host is
+    # the first point where they stop matching consecutive candidates
+    candidate = first_host
+    for index in range(bisect_left(used_values, first_host), len(used_values)):
+        if used_values[index] != candidate:
+            break
+        candidate += 1
+    return str(ipaddress.IPv4Address(candidate)) if candidate <= last_host else None
 
 
 def ip_in_network(ip_address: str, network_cidr: str) -> bool:
@@ -135,12 +232,98 @@ def ip_in_network(ip_address: str, network_cidr: str) -> bool:
     Returns:
         True if IP is in network, False otherwise
     """
+    if not validate_ip(ip_address):
+        return False
     try:
-        ip = ipaddress.IPv4Address(ip_address)
-        network = parse_network(network_cidr)
-        return ip in network
+        network_int, _, mask = network_ints(network_cidr)
     except ValueError:
         return False
+    return ip_in_network_int(ip_to_int(ip_address), network_int, mask)
+
+
+def ip_in_network_int(ip_int: int, network_int: int, mask: int) -> bool:
+    """
+    Check if an integer IP address belongs to a network given as integers.
+    
+    Args:
+        ip_int: IP address as an integer
+        network_int: Network address as an integer
+        mask: Netmask as an integer
+        
+    Returns:
+        True if IP is in network, False otherwise
+    """
+    return (ip_int & mask) == network_int
+
+
+def ip_to_int(ip_address: str) -> int:
+    """
+    Convert a dotted-quad IPv4 address to an integer.
+    
+    Input is checked against the strict dotted-quad form IPv4Address accepts
+    first; inet_aton alone would also take shorthand ("10.1") and octal
+    ("192.168.1.010") forms and return the wrong address.
+    
+    Raises:
+        ValueError: If the address is not a valid dotted-quad IPv4 address
+    """
+    if not validate_ip(ip_address):
+        raise ValueError(f"Invalid IPv4 address: {ip_address!r}")
+    return int.from_bytes(socket.inet_aton(ip_address), "big")
+
+
+def index_ips(ip_addresses: Iterable[str]) -> tuple[list[str], array]:
+    """
+    Parse IP addresses once into parallel address and integer-value arrays.
+    
+    Args:
+        ip_addresses: IP addresses to index (unparseable entries are dropped)
+        
+    Returns:
+        Tuple of (addresses, values) sorted by value, where values[i] is the
+        integer form of addresses[i]
+    """
+    parsed = []
+    for ip in ip_addresses:
+        try:
+            parsed.append((ip_to_int(ip), ip))
+        except ValueError:
+            continue
+    parsed.sort()
+    values = array("L", [value for value, _ in parsed])
+    addresses = [ip for _, ip in parsed]
+    return addresses, values
+
+
+def group_ips_by_network(
+    ip_addresses: list[str],
+    network_cidrs: list[str],
+    ip_values: array | None = None
+) -> dict[str, list[str]]:
+    """
+    Assign IP addresses to the networks that contain them.
+    
+    With the IPs sorted by integer value, each network's members are one
+    contiguous slice, found by binary search on its first and last address.
+    
+    Args:
+        ip_addresses: IP addresses to assign (unparseable entries are ignored)
+        network_cidrs: Networks in CIDR notation
+        ip_values: Integer values of ip_addresses, if already indexed by index_ips
+        
+    Returns:
+        Dictionary mapping each network CIDR to the IPs inside it, in address order
+    """
+    if ip_values is None:
+        ip_addresses, ip_values = index_ips(ip_addresses)
+    
+    result = {}
+    for network_cidr in network_cidrs:
+        network_int, broadcast_int, _ = network_ints(network_cidr)
+        start = bisect_left(ip_values, network_int)
+        end = bisect_right(ip_values, broadcast_int, start)
+        result[network_cidr] = ip_addresses[start:end]
+    return result
 
 
 def validate_ip(ip_address: str) -> bool:
@@ -153,11 +336,12 @@ def validate_ip(ip_address: str) -> bool:
     Returns:
         True if valid IPv4 address, False otherwise
     """
-    try:
-        ipaddress.IPv4Address(ip_address)
-        return True
-    except ValueError:
-        return False
+    return isinstance(ip_address, str) and _is_ipv4(ip_address)
+
+
+@lru_cache(maxsize=4096)
+def _is_ipv4(ip_address: str) -> bool:
+    return _IPV4_RE.fullmatch(ip_address) is not None
 
 
 def validate_network(network_cidr: str) -> bool:
@@ -170,8 +354,14 @@ def validate_network(network_cidr: str) -> bool:
     Returns:
         True if valid CIDR, False otherwise
     """
+    return isinstance(network_cidr, str) and _is_network(network_cidr)
+
+
+@lru_cache(maxsize=4096)
+def _is_network(network_cidr: str) -> bool:
+    # Caches rejections too, which parse_network cannot since it raises
     try:
-        ipaddress.IPv4Network(network_cidr, strict=False)
+        parse_network(network_cidr)
         return True
     except ValueError:
         return False
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+import orjson
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+# Finished job files older than this are removed on the next submit
+JOB_RETENTION_SECONDS = 24 * 60 * 60
+# A job still "running" after this long is reported as failed
+JOB_TIMEOUT_SECONDS = 60 * 60
+
+
+class JobRunner:
+    """
+    Run long operations on background threads and record their status as
+    JSON files, so any gunicorn worker can answer a status lookup.
+    """
+
+    def __init__(self, job_dir: str, max_workers: int = 2):
+        self.job_dir = job_dir
+        os.makedirs(job_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync-job")
+
+    def submit(self, fn: Callable[[], dict[str, Any]]) -> str:
+        """Start fn in the background and return its job id."""
+        self._prune()
+        job_id = uuid.uuid4().hex
+        # The owning process lets status() spot jobs whose worker was killed
+        self._write(job_id, {
+            "job_id": job_id,
+            "status": "running",
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "started_at": time.time(),
+        })
+        self._executor.submit(self._run, job_id, fn)
+        return job_id
+
+    def status(self, job_id: str) -> dict[str, Any] | None:
+        """
+        Get the recorded status of a job, or None if it is unknown.
+
+        A running job whose process has exited (worker timeout, restart, OOM)
+        or that has run longer than JOB_TIMEOUT_SECONDS is reported as failed.
+        """
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            with open(self._path(job_id), "rb") as handle:
+                state = orjson.loads(handle.read())
+        except FileNotFoundError:
+            return None
+        if state.get("status") != "running":
+            return state
+
+        error = None
+        if time.time() - state.get("started_at", 0) > JOB_TIMEOUT_SECONDS:
+            error = f"Job did not finish within {JOB_TIMEOUT_SECONDS} seconds"
+        elif state.get("host") == socket.gethostname() and not _process_alive(state.get("pid")):
+            error = "Job's worker process exited before it finished"
+        if error is None:
+            return state
+        return {"job_id": job_id, "status": "failed", "error": error}
+
+    def _run(self, job_id: str, fn: Callable[[], dict[str, Any]]) -> None:
+        try:
+            state = {"job_id": job_id, "status": "completed", "result": fn()}
+        except Exception as exc:
+            logging.exception("Background job %s failed", job_id)
+            state = {"job_id": job_id, "status": "failed", "error": str(exc)}
+        self._write(job_id, state)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.job_dir, f"{job_id}.json")
+
+    def _write(self, job_id: str, state: dict[str, Any]) -> None:
+        # Write then rename so readers never see a partial file
+        path = self._path(job_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(orjson.dumps(state))
+        os.replace(tmp_path, path)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        with os.scandir(self.job_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+
+
+def _process_alive(pid: int | None) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists but belongs to another user
+        return True
+    return True
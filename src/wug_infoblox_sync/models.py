@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Any
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class WUGDevice:
     source_id: str
     hostname: str
@@ -11,7 +11,7 @@ class WUGDevice:
     raw: dict[str, Any]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InfobloxHostRecord:
     fqdn: str
     ip_address: str
@@ -19,7 +19,23 @@ class InfobloxHostRecord:
     extattrs: dict[str, dict[str, str]]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
+class SyncDetail:
+    """Outcome of syncing one device or host record; unset fields are omitted from to_dict()."""
+    hostname: str
+    ip_address: str
+    device_id: str | None = None
+    action: str | None = None
+    reason: str | None = None
+    message: str | None = None
+    error: str | None = None
+    result: dict[str, Any] | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: value for name in self.__slots__ if (value := getattr(self, name)) is not None}
+
+
+@dataclass(frozen=True, slots=True)
 class SyncResult:
     discovered: int
     processed: int
@@ -27,4 +43,4 @@ class SyncResult:
     skipped: int
     errors: int
     dry_run: bool
-    details: list[dict[str, Any]]
+    details: list[SyncDetail]
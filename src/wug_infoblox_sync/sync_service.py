@@ -1,58 +1,59 @@
 from __future__ import annotations
 
-from dataclasses import asdict
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
 
 from .config import Settings
-from .infoblox_client import InfobloxClient
 from .mapper import device_to_infoblox_record
-from .models import SyncResult
-from .wug_client import WUGClient
+from .models import SyncDetail, SyncResult, WUGDevice
+
+if TYPE_CHECKING:
+    from .infoblox_client import InfobloxClient
+    from .wug_client import WUGClient
+
+# Host records per WAPI multi-object request
+BULK_BATCH_SIZE = 100
+# Device templates per WUG template PATCH
+WUG_CREATE_BATCH_SIZE = 50
 
 
 class SyncService:
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        wug_client: WUGClient | None = None,
+        infoblox_client: InfobloxClient | None = None,
+    ):
         self.settings = settings
-        self.wug_client = WUGClient(settings)
-        self.infoblox_client = InfobloxClient(settings)
+        # The client modules pull in requests, so only import them when a
+        # client has to be built here
+        if wug_client is None:
+            from .wug_client import WUGClient
+
+            wug_client = WUGClient(settings)
+        if infoblox_client is None:
+            from .infoblox_client import InfobloxClient
+
+            infoblox_client = InfobloxClient(settings)
+        self.wug_client = wug_client
+        self.infoblox_client = infoblox_client
 
     def run_sync(self, dry_run: bool, limit: int | None = None) -> SyncResult:
-        devices = self.wug_client.get_devices(limit=limit)
-        details: list[dict[str, Any]] = []
-
-        processed = 0
-        changed = 0
-        skipped = 0
-        errors = 0
-
-        for device in devices:
-            processed += 1
-            try:
-                record = device_to_infoblox_record(device, self.settings)
-                result = self.infoblox_client.upsert_host_record(record, dry_run=dry_run)
-                changed += 1 if result.get("changed") else 0
-                details.append(
-                    {
-                        "device_id": device.source_id,
-                        "hostname": device.hostname,
-                        "ip_address": device.ip_address,
-                        "result": result,
-                    }
-                )
-            except Exception as exc:
-                errors += 1
-                details.append(
-                    {
-                        "device_id": device.source_id,
-                        "hostname": device.hostname,
-                        "ip_address": device.ip_address,
-                        "error": str(exc),
-                    }
-                )
+        devices = self.wug_client.iter_devices(limit=limit)
+
+        if dry_run:
+            # Dry-run upserts do no I/O
+            details = [self._sync_device(device, dry_run=True) for device in devices]
+        else:
+            details = self._sync_batches(devices)
+
+        changed = sum(1 for detail in details if detail.result and detail.result.get("changed"))
+        skipped = sum(1 for detail in details if detail.result and detail.result.get("action") == "superseded")
+        errors = sum(1 for detail in details if detail.error is not None)
 
         return SyncResult(
-            discovered=len(devices),
-            processed=processed,
+            discovered=len(details),
+            processed=len(details),
             created_or_updated=changed,
             skipped=skipped,
             errors=errors,
@@ -60,6 +61,94 @@ class SyncService:
             details=details,
         )
 
+    def _sync_device(self, device: WUGDevice, dry_run: bool) -> SyncDetail:
+        try:
+            record = device_to_infoblox_record(device, self.settings)
+            result = self.infoblox_client.upsert_host_record(record, dry_run=dry_run)
+            return self._device_detail(device, result=result)
+        except Exception as exc:
+            return self._device_detail(device, error=str(exc))
+
+    def _sync_batches(self, devices: Iterable[WUGDevice]) -> list[SyncDetail]:
+        # Each batch is one pair of WAPI multi-object requests; batches are
+        # independent, so overlap them on a bounded pool. map() submits each
+        # batch as soon as it is read from WUG, so upserts start while later
+        # groups are still being fetched.
+        # A device whose FQDN already went out in an earlier batch is held back
+        # and synced after the concurrent batches finish, so two batches never
+        # race to create the same host record and the later device still wins
+        positions: list[list[int]] = []
+        deferred: list[tuple[int, WUGDevice]] = []
+
+        def batches() -> Iterator[list[WUGDevice]]:
+            sent: set[str] = set()
+            batch: list[WUGDevice] = []
+            batch_positions: list[int] = []
+            batch_fqdns: set[str] = set()
+            for index, device in enumerate(devices):
+                fqdn = self._fqdn(device)
+                if fqdn in sent:
+                    deferred.append((index, device))
+                    continue
+                batch.append(device)
+                batch_positions.append(index)
+                if fqdn is not None:
+                    batch_fqdns.add(fqdn)
+                if len(batch) == BULK_BATCH_SIZE:
+                    sent |= batch_fqdns
+                    positions.append(batch_positions)
+                    yield batch
+                    batch, batch_positions, batch_fqdns = [], [], set()
+            if batch:
+                positions.append(batch_positions)
+                yield batch
+
+        with ThreadPoolExecutor(max_workers=self.settings.sync_workers) as executor:
+            batch_results = list(executor.map(self._sync_batch, batches()))
+
+        details: list[SyncDetail | None] = [None] * (sum(map(len, positions)) + len(deferred))
+        for batch_positions, batch_details in zip(positions, batch_results):
+            for index, detail in zip(batch_positions, batch_details):
+                details[index] = detail
+        # Deferred devices go out one batch at a time, so a repeat FQDN finds
+        # the record written before it and becomes an update
+        for start in range(0, len(deferred), BULK_BATCH_SIZE):
+            chunk = deferred[start:start + BULK_BATCH_SIZE]
+            batch_details = self._sync_batch([device for _, device in chunk])
+            for (index, _), detail in zip(chunk, batch_details):
+                details[index] = detail
+        return details
+
+    def _fqdn(self, device: WUGDevice) -> str | None:
+        try:
+            return device_to_infoblox_record(device, self.settings).fqdn
+        except Exception:
+            # _sync_batch reports the mapping error for this device
+            return None
+
+    def _sync_batch(self, devices: list[WUGDevice]) -> list[SyncDetail]:
+        # A WAPI request is transactional, so a failure applies to the whole batch
+        try:
+            records = [device_to_infoblox_record(device, self.settings) for device in devices]
+            results = self.infoblox_client.bulk_upsert_host_records(records)
+        except Exception as exc:
+            return [self._device_detail(device, error=str(exc)) for device in devices]
+        return [self._device_detail(device, result=result) for device, result in zip(devices, results)]
+
+    @staticmethod
+    def _device_detail(
+        device: WUGDevice,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> SyncDetail:
+        return SyncDetail(
+            device_id=device.source_id,
+            hostname=device.hostname,
+            ip_address=device.ip_address,
+            result=result,
+            error=error,
+        )
+
     def run_reverse_sync(self, dry_run: bool, limit: int | None = None) -> SyncResult:
         """
         Reverse sync: Import devices from Infoblox into WhatsUp Gold.
@@ -71,88 +160,47 @@ class SyncService:
         Returns:
             SyncResult with details of import operation
         """
-        # Get all host records from Infoblox
-        infoblox_records = self.infoblox_client.get_all_host_records(limit=limit)
-        details: list[dict[str, Any]] = []
-
-        processed = 0
-        created = 0
-        skipped = 0
-        errors = 0
-
-        for record in infoblox_records:
-            processed += 1
-            hostname = record.get("hostname", "")
-            ip_address = record.get("ip_address", "")
-            
-            if not hostname or not ip_address:
-                skipped += 1
-                details.append({
-                    "hostname": hostname or "unknown",
-                    "ip_address": ip_address or "unknown",
-                    "action": "skipped",
-                    "reason": "Missing hostname or IP address",
-                })
-                continue
-            
-            try:
-                # Check if device already exists in WUG
-                if self.wug_client.device_exists(ip_address):
-                    skipped += 1
-                    details.append({
-                        "hostname": hostname,
-                        "ip_address": ip_address,
-                        "action": "skipped",
-                        "reason": "Device already exists in WUG",
-                    })
-                    continue
-                
-                if dry_run:
-                    created += 1
-                    details.append({
-                        "hostname": hostname,
-                        "ip_address": ip_address,
-                        "action": "dry-run-create",
-                        "message": "Would create device in WUG",
-                    })
-                else:
-                    # Create device in WUG
-                    result = self.wug_client.create_device(
-                        display_name=hostname,
-                        ip_address=ip_address,
-                        hostname=hostname,
-                    )
-                    
-                    if result.get("success"):
-                        created += 1
-                        details.append({
-                            "hostname": hostname,
-                            "ip_address": ip_address,
-                            "action": "created",
-                            "device_id": result.get("device_id"),
-                            "message": "Successfully created in WUG",
-                        })
-                    else:
-                        errors += 1
-                        details.append({
-                            "hostname": hostname,
-                            "ip_address": ip_address,
-                            "action": "failed",
-                            "error": result.get("message", "Unknown error"),
-                        })
-                        
-            except Exception as exc:
-                errors += 1
-                details.append({
-                    "hostname": hostname,
-                    "ip_address": ip_address,
-                    "action": "failed",
-                    "error": str(exc),
-                })
+        with ThreadPoolExecutor(max_workers=self.settings.sync_workers) as executor:
+            # One snapshot of WUG device IPs serves every existence check in the
+            # run; it does not depend on the Infoblox records, so fetch both at once
+            known_ips_future = executor.submit(self.wug_client.get_known_ip_set)
+            # Get all host records from Infoblox
+            infoblox_records = self.infoblox_client.get_all_host_records(limit=limit)
+            known_ips = known_ips_future.result()
+
+            # Existence checks are in-memory; records left to create are collected
+            # with their position in details and created in batches. IPs already
+            # queued count as existing, so records sharing an IP create one device
+            details: list[SyncDetail] = []
+            pending: list[tuple[int, dict[str, Any]]] = []
+            seen: set[str] = set()
+            for record in infoblox_records:
+                detail = self._check_record(record, known_ips, seen, dry_run)
+                if detail is None:
+                    pending.append((len(details), record))
+                details.append(detail)
+
+            # Each batch is one template PATCH; batches are independent, so overlap
+            # them on the same pool
+            batches = [
+                [record for _, record in pending[start:start + WUG_CREATE_BATCH_SIZE]]
+                for start in range(0, len(pending), WUG_CREATE_BATCH_SIZE)
+            ]
+            created_details = [
+                detail
+                for batch_details in executor.map(self._import_batch, batches)
+                for detail in batch_details
+            ]
+        for (index, _), detail in zip(pending, created_details):
+            details[index] = detail
+
+        created = sum(1 for detail in details if detail.action in ("created", "dry-run-create"))
+        skipped = sum(1 for detail in details if detail.action == "skipped")
+        errors = sum(1 for detail in details if detail.action == "failed")
 
         return SyncResult(
             discovered=len(infoblox_records),
-            processed=processed,
+            processed=len(details),
             created_or_updated=created,
             skipped=skipped,
             errors=errors,
@@ -161,5 +209,99 @@ class SyncService:
         )
 
     @staticmethod
-    def result_dict(result: SyncResult) -> dict[str, Any]:
-        return asdict(result)
+    def _check_record(
+        record: dict[str, Any],
+        known_ips: frozenset[str],
+        seen: set[str],
+        dry_run: bool,
+    ) -> SyncDetail | None:
+        # Returns the record's detail, or None if it has to be created in WUG;
+        # adds the IP of every record it lets through to seen
+        hostname = record.get("hostname", "")
+        ip_address = record.get("ip_address", "")
+        
+        if not hostname or not ip_address:
+            return SyncDetail(
+                hostname=hostname or "unknown",
+                ip_address=ip_address or "unknown",
+                action="skipped",
+                reason="Missing hostname or IP address",
+            )
+        
+        # Check if device already exists in WUG
+        if ip_address in known_ips or ip_address in seen:
+            return SyncDetail(
+                hostname=hostname,
+                ip_address=ip_address,
+                action="skipped",
+                reason="Device already exists in WUG",
+            )
+        seen.add(ip_address)
+        
+        if dry_run:
+            return SyncDetail(
+                hostname=hostname,
+                ip_address=ip_address,
+                action="dry-run-create",
+                message="Would create device in WUG",
+            )
+        return None
+
+    def _import_batch(self, records: list[dict[str, Any]]) -> list[SyncDetail]:
+        # A failed request fails every record in the batch
+        try:
+            templates = [
+                self.wug_client.device_template(
+                    display_name=record["hostname"],
+                    ip_address=record["ip_address"],
+                    hostname=record["hostname"],
+                )
+                for record in records
+            ]
+            results = self.wug_client.create_devices_bulk(templates, batch_size=WUG_CREATE_BATCH_SIZE)
+        except Exception as exc:
+            return [
+                SyncDetail(
+                    hostname=record["hostname"],
+                    ip_address=record["ip_address"],
+                    action="failed",
+                    error=str(exc),
+                )
+                for record in records
+            ]
+        return [self._import_detail(record, result) for record, result in zip(records, results)]
+
+    @staticmethod
+    def _import_detail(record: dict[str, Any], result: dict[str, Any]) -> SyncDetail:
+        hostname = record["hostname"]
+        ip_address = record["ip_address"]
+        if result.get("success"):
+            return SyncDetail(
+                hostname=hostname,
+                ip_address=ip_address,
+                action="created",
+                device_id=result.get("device_id"),
+                message="Successfully created in WUG",
+            )
+        return SyncDetail(
+            hostname=hostname,
+            ip_address=ip_address,
+            action="failed",
+            error=result.get("message", "Unknown error"),
+        )
+
+    @staticmethod
+    def result_dict(result: SyncResult, include_details: bool = True) -> dict[str, Any]:
+        # asdict() would deep-copy every upsert result and keep unset detail fields
+        summary: dict[str, Any] = {
+            "discovered": result.discovered,
+            "processed": result.processed,
+            "created_or_updated": result.created_or_updated,
+            "skipped": result.skipped,
+            "errors": result.errors,
+            "dry_run": result.dry_run,
+        }
+        # Details are only converted when the caller asked for them
+        if include_details:
+            summary["details"] = [detail.to_dict() for detail in result.details]
+        return summary
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+# urllib3 already sets TCP_NODELAY; add SO_KEEPALIVE so idle pooled
+# connections are probed rather than silently dropped by middleboxes
+SOCKET_OPTIONS = [
+    *HTTPConnection.default_socket_options,
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+# Sized for the sync thread pool plus concurrent request threads; sessions
+# serving more sync workers than this are sized up to match
+POOL_MAXSIZE = 64
+# Per-host pools kept by each session's pool manager
+POOL_CONNECTIONS = 32
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every request sent through one session."""
+
+    def __init__(self, requests_per_second: float):
+        self.rate = requests_per_second
+        # Allow up to one second's worth of requests in a burst
+        self.capacity = max(1.0, requests_per_second)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for seconds, as asked by a server's Retry-After."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class RateLimitedRetry(Retry):
+    """
+    Retry that counts each retry against the session's rate limiter and applies
+    a server's Retry-After to it.
+    """
+
+    rate_limiter: RateLimiter | None = None
+
+    def new(self, **kw: Any) -> RateLimitedRetry:
+        retry = super().new(**kw)
+        retry.rate_limiter = self.rate_limiter
+        return retry
+
+    def sleep(self, response: Any = None) -> None:
+        super().sleep(response)
+        if self.rate_limiter is not None:
+            # urllib3 resends from inside the adapter, past KeepAliveAdapter.send,
+            # so each retry takes its token here
+            self.rate_limiter.acquire()
+
+    def sleep_for_retry(self, response: Any) -> bool:
+        retry_after = self.get_retry_after(response)
+        if retry_after and self.rate_limiter is not None:
+            # Other threads would otherwise keep sending into the same 429/503
+            self.rate_limiter.pause(retry_after)
+        return super().sleep_for_retry(response)
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections are opened with SOCKET_OPTIONS."""
+
+    def __init__(self, *args: Any, rate_limiter: RateLimiter | None = None, **kwargs: Any):
+        self.rate_limiter = rate_limiter
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("socket_options", SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(self, request: requests.PreparedRequest, *args: Any, **kwargs: Any) -> requests.Response:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return super().send(request, *args, **kwargs)
+
+
+def build_session(workers: int = 0, requests_per_second: float = 0) -> requests.Session:
+    """
+    Create a session with retry/backoff and a keep-alive pool mounted for http and https.
+    
+    Args:
+        workers: Threads that will share the session; the per-host pool holds at
+            least this many connections so none are opened and discarded
+        requests_per_second: Limit on requests sent through the session across
+            all threads; 0 for no limit
+    """
+    session = requests.Session()
+    rate_limiter = RateLimiter(requests_per_second) if requests_per_second > 0 else None
+    retry = RateLimitedRetry(
+        total=3,
+        connect=3,
+        read=3,
+        status=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "POST", "PUT", "PATCH", "DELETE"),
+    )
+    retry.rate_limiter = rate_limiter
+    adapter = KeepAliveAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=max(POOL_MAXSIZE, workers),
+        max_retries=retry,
+        rate_limiter=rate_limiter,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -1,158 +1,278 @@
 from __future__ import annotations
 
-from typing import Any
+import atexit
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
+import orjson
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
+from .cache import TTLCache
 from .config import Settings
 from .models import WUGDevice
+from .transport import build_session
+
+# Lifetime assumed when the token response carries no expires_in
+DEFAULT_TOKEN_LIFETIME_SECONDS = 3600
+# Re-authenticate this long before expiry so in-flight requests do not race it
+TOKEN_EXPIRY_MARGIN_SECONDS = 30
+# Device templates per /devices/-/config/template request
+CREATE_BATCH_SIZE = 50
+# Listing URLs (the group list plus one per device group) kept for revalidation
+ETAG_CACHE_SIZE = 1024
+
+# Device fields WUG may report each value under, in order of preference
+_DEVICE_ID_KEYS = ("id", "deviceId")
+_DEVICE_HOSTNAME_KEYS = ("displayName", "hostName", "name")
+_DEVICE_IP_KEYS = ("networkAddress", "ipAddress", "primaryAddress")
+_DEVICE_STATUS_KEYS = ("bestState", "state", "status")
+
+
+def _first_str(item: dict[str, Any], keys: tuple[str, ...]) -> str:
+    """Return the first truthy value among keys in item as a string, or "" if none."""
+    for key in keys:
+        value = item.get(key)
+        if value:
+            return str(value)
+    return ""
 
 
 class WUGClient:
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, session: requests.Session | None = None):
+        """
+        Args:
+            settings: Service settings
+            session: Session to send requests through; defaults to a new
+                transport.build_session(), rate limited to
+                settings.wug_requests_per_second (0, the default, for no limit). Do not pass InfobloxClient's session,
+                which carries Infoblox basic auth.
+        """
         self.settings = settings
-        self.session = requests.Session()
-        retry = Retry(
-            total=3,
-            connect=3,
-            read=3,
-            status=3,
-            backoff_factor=0.5,
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=("GET", "POST", "PUT", "PATCH", "DELETE"),
-        )
-        adapter = HTTPAdapter(max_retries=retry)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        if session is None:
+            session = build_session(settings.sync_workers, settings.wug_requests_per_second)
+        self.session = session
+        atexit.register(self.close)
+        # Known device IPs, refreshed at most once per cache TTL; concurrent
+        # existence checks share a single device fetch
+        self._known_ips = TTLCache(settings.cache_ttl_seconds, maxsize=1)
+        # Bearer token shared by all requests until shortly before it expires
+        self._token_value: str | None = None
+        self._token_expiry = 0.0
+        self._token_lock = threading.Lock()
+        # (ETag, parsed body) of the last group and device listings per URL
+        self._etag_cache = TTLCache(math.inf, maxsize=ETAG_CACHE_SIZE)
+
+    def close(self) -> None:
+        """Release pooled keep-alive connections."""
+        self.session.close()
 
     def _token(self) -> str:
-        payload = {
-            "grant_type": "password",
-            "username": self.settings.wug_username,
-            "password": self.settings.wug_password,
-        }
-        token_url = f"{self.settings.wug_base_url.rstrip('/')}{self.settings.wug_token_endpoint}"
-        response = self.session.post(
-            token_url,
-            data=payload,
+        """Return the cached bearer token, authenticating when it is missing or near expiry."""
+        with self._token_lock:
+            if self._token_value is not None and time.monotonic() < self._token_expiry - TOKEN_EXPIRY_MARGIN_SECONDS:
+                return self._token_value
+            payload = {
+                "grant_type": "password",
+                "username": self.settings.wug_username,
+                "password": self.settings.wug_password,
+            }
+            token_url = f"{self.settings.wug_base_url.rstrip('/')}{self.settings.wug_token_endpoint}"
+            response = self.session.post(
+                token_url,
+                data=payload,
+                timeout=self.settings.sync_timeout_seconds,
+                verify=self.settings.sync_verify_ssl,
+            )
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            token = data.get("access_token")
+            if not token:
+                raise RuntimeError("WUG authentication succeeded but no access_token returned")
+            self._token_value = token
+            self._token_expiry = time.monotonic() + float(data.get("expires_in") or DEFAULT_TOKEN_LIFETIME_SECONDS)
+            return token
+
+    def _invalidate_token(self, token: str) -> None:
+        """Drop token from the cache unless another thread already replaced it."""
+        with self._token_lock:
+            if self._token_value == token:
+                self._token_value = None
+
+    def _send(self, method: str, url: str, headers: dict[str, str], **kwargs: Any) -> requests.Response:
+        """
+        Send an authenticated request, re-authenticating and retrying once on 401.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            headers: Request headers, without Authorization
+            **kwargs: Passed through to requests.Session.request
+        """
+        token = self._token()
+        response = self.session.request(
+            method,
+            url,
+            headers={**headers, "Authorization": f"Bearer {token}"},
             timeout=self.settings.sync_timeout_seconds,
             verify=self.settings.sync_verify_ssl,
+            **kwargs,
         )
+        if response.status_code == 401:
+            # Token revoked or expired early on the server side
+            self._invalidate_token(token)
+            token = self._token()
+            response = self.session.request(
+                method,
+                url,
+                headers={**headers, "Authorization": f"Bearer {token}"},
+                timeout=self.settings.sync_timeout_seconds,
+                verify=self.settings.sync_verify_ssl,
+                **kwargs,
+            )
+        return response
+
+    def _cached_get(self, url: str, headers: dict[str, str]) -> Any:
+        """
+        GET url and return its parsed JSON body.
+        
+        A body that came with an ETag is kept and revalidated with If-None-Match
+        on the next call; a 304 reuses it without downloading or parsing anything.
+        """
+        cached = self._etag_cache.get(url)
+        if cached:
+            headers = {**headers, "If-None-Match": cached[0]}
+        response = self._send("GET", url, headers)
+        if cached and response.status_code == 304:
+            return cached[1]
         response.raise_for_status()
-        data = response.json()
-        token = data.get("access_token")
-        if not token:
-            raise RuntimeError("WUG authentication succeeded but no access_token returned")
-        return token
+        data = orjson.loads(response.content)
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache.set(url, (etag, data))
+        return data
 
     def get_devices(self, limit: int | None = None) -> list[WUGDevice]:
         """
         Get devices from WUG by iterating through device groups.
         Uses /device-groups/- endpoint followed by /device-groups/{groupId}/devices
         """
-        token = self._token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/json",
-        }
+        return list(self.iter_devices(limit))
+
+    def iter_devices(self, limit: int | None = None) -> Iterator[WUGDevice]:
+        """
+        Yield devices from WUG as each device group's fetch completes, in group order.
+        
+        Args:
+            limit: Maximum number of devices to yield (optional)
+        """
+        headers = {"Accept": "application/json"}
         
         # First get all device groups
         base_url = self.settings.wug_base_url.rstrip('/')
         groups_endpoint = f"{base_url}/api/v1/device-groups/-"
         
-        groups_response = self.session.get(
-            groups_endpoint,
-            headers=headers,
-            timeout=self.settings.sync_timeout_seconds,
-            verify=self.settings.sync_verify_ssl,
-        )
-        groups_response.raise_for_status()
-        groups_data = groups_response.json()
+        groups_data = self._cached_get(groups_endpoint, headers)
         
         if not isinstance(groups_data, dict) or 'data' not in groups_data:
-            return []
+            return
         
-        groups = groups_data['data'].get('groups', [])
+        # A group listed more than once would only cost a request. deviceCount
+        # is not used to skip groups: it may leave out devices the group's
+        # device listing returns (e.g. from subgroups)
+        groups = []
+        seen_group_ids = set()
+        for group in groups_data['data'].get('groups', []):
+            group_id = group.get('id')
+            if not group_id or group_id in seen_group_ids:
+                continue
+            seen_group_ids.add(group_id)
+            groups.append(group)
+        
+        def fetch_group_devices(group: dict[str, Any]) -> list[Any]:
+            try:
+                devices_endpoint = f"{base_url}/api/v1/device-groups/{group['id']}/devices"
+                devices_data = self._cached_get(devices_endpoint, headers)
+            except Exception as e:
+                # Log warning but continue with other groups
+                logging.warning("Failed to get devices from group %s: %s", group.get('name', 'Unknown'), e)
+                return []
+            if isinstance(devices_data, dict) and 'data' in devices_data:
+                return devices_data['data'].get('devices', [])
+            return []
         
         # Get devices from each group
-        all_devices: list[WUGDevice] = []
         seen_device_ids = set()
         
-        for group in groups:
-            group_id = group.get('id')
-            group_name = group.get('name', 'Unknown')
-            
-            if not group_id:
-                continue
-            
-            try:
-                devices_endpoint = f"{base_url}/api/v1/device-groups/{group_id}/devices"
-                devices_response = self.session.get(
-                    devices_endpoint,
-                    headers=headers,
-                    timeout=self.settings.sync_timeout_seconds,
-                    verify=self.settings.sync_verify_ssl,
-                )
-                devices_response.raise_for_status()
-                devices_data = devices_response.json()
+        # Group requests are independent, so fetch them concurrently; map()
+        # yields in group order, keeping dedup and limit handling here, on one
+        # thread, deterministic
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(self.settings.sync_workers, len(groups))),
+            thread_name_prefix="wug-groups",
+        )
+        try:
+            for group, devices in zip(groups, executor.map(fetch_group_devices, groups)):
+                group_id = group['id']
+                group_name = group.get('name', 'Unknown')
                 
-                if isinstance(devices_data, dict) and 'data' in devices_data:
-                    devices = devices_data['data'].get('devices', [])
+                for item in devices:
+                    if not isinstance(item, dict):
+                        continue
                     
-                    for item in devices:
-                        if not isinstance(item, dict):
-                            continue
-                        
-                        device_id = str(item.get("id") or item.get("deviceId") or "")
-                        
-                        # Skip duplicates
-                        if device_id in seen_device_ids:
-                            continue
-                        
-                        hostname = str(item.get("displayName") or item.get("hostName") or item.get("name") or "")
-                        ip = str(
-                            item.get("networkAddress")
-                            or item.get("ipAddress")
-                            or item.get("primaryAddress")
-                            or ""
-                        )
-                        status = str(item.get("bestState") or item.get("state") or item.get("status") or "unknown")
-                        
-                        if not device_id or not ip:
-                            continue
-                        
-                        # Add group information to raw data
-                        item['group_id'] = group_id
-                        item['group_name'] = group_name
-                        
-                        all_devices.append(
-                            WUGDevice(
-                                source_id=device_id,
-                                hostname=hostname or f"wug-{device_id}",
-                                ip_address=ip,
-                                status=status,
-                                raw=item,
-                            )
-                        )
-                        seen_device_ids.add(device_id)
-                        
-                        if limit and len(all_devices) >= limit:
-                            return all_devices
-            
-            except Exception as e:
-                # Log warning but continue with other groups
-                print(f"Warning: Failed to get devices from group {group_name}: {e}")
-                continue
+                    device_id = _first_str(item, _DEVICE_ID_KEYS)
+                    
+                    # Skip duplicates
+                    if not device_id or device_id in seen_device_ids:
+                        continue
+                    
+                    ip = _first_str(item, _DEVICE_IP_KEYS)
+                    if not ip:
+                        continue
+                    
+                    hostname = _first_str(item, _DEVICE_HOSTNAME_KEYS)
+                    status = _first_str(item, _DEVICE_STATUS_KEYS) or "unknown"
+                    
+                    # Add group information to raw data; copied, since the
+                    # parsed listing may be reused for a later 304
+                    item = {**item, 'group_id': group_id, 'group_name': group_name}
+                    
+                    seen_device_ids.add(device_id)
+                    yield WUGDevice(
+                        source_id=device_id,
+                        hostname=hostname or f"wug-{device_id}",
+                        ip_address=ip,
+                        status=status,
+                        raw=item,
+                    )
+                    
+                    if limit and len(seen_device_ids) >= limit:
+                        return
+        finally:
+            # Once the limit is reached or the caller stops early, drop group
+            # fetches that have not started
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_known_ip_set(self) -> frozenset[str]:
+        """
+        Get the IP addresses of all WUG devices as an immutable snapshot.
         
-        return all_devices
+        The device list is fetched at most once per cache TTL, so a device
+        deleted in WUG can still be reported for up to cache_ttl_seconds.
+        Devices created through this client are added to the cached snapshot
+        straight away.
+        """
+        return self._known_ips.get_or_set(
+            "ips", lambda: frozenset(device.ip_address for device in self.get_devices())
+        )
 
     def device_exists(self, ip_address: str) -> bool:
         """
         Check if a device with the given IP address already exists in WUG.
         """
-        devices = self.get_devices()
-        return any(d.ip_address == ip_address for d in devices)
+        return ip_address in self.get_known_ip_set()
 
     def create_device(
         self,
@@ -180,18 +300,37 @@ class WUGClient:
         Returns:
             Dictionary with creation result including device ID
         """
-        token = self._token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-        }
+        template = self.device_template(
+            display_name,
+            ip_address,
+            hostname=hostname,
+            device_type=device_type,
+            primary_role=primary_role,
+            poll_interval=poll_interval,
+            enable_monitoring=enable_monitoring,
+        )
+        return self.create_devices_bulk([template])[0]
+
+    @staticmethod
+    def device_template(
+        display_name: str,
+        ip_address: str,
+        hostname: str | None = None,
+        device_type: str = "Network Device",
+        primary_role: str = "Device",
+        poll_interval: int = 60,
+        enable_monitoring: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Build a device template for the /devices/-/config/template endpoint.
         
+        Takes the same arguments as create_device.
+        """
         if hostname is None:
             hostname = display_name
         
         # Build device template payload based on WUG API schema
-        device_template = {
+        return {
             "displayName": display_name,
             "deviceType": device_type,
             "primaryRole": primary_role,
@@ -215,49 +354,104 @@ class WUGClient:
             "layer2Data": "",
             "groups": [],
         }
+
+    def create_devices_bulk(
+        self,
+        templates: list[dict[str, Any]],
+        batch_size: int = CREATE_BATCH_SIZE,
+    ) -> list[dict[str, Any]]:
+        """
+        Create many devices, sending up to batch_size templates per request.
+        
+        Args:
+            templates: Device templates, as built by device_template
+            batch_size: Templates per PATCH request
+            
+        Returns:
+            One result per template, in the same shape as create_device
+        """
+        results: list[dict[str, Any]] = []
+        for start in range(0, len(templates), batch_size):
+            results.extend(self._create_template_batch(templates[start:start + batch_size]))
+        return results
+
+    def _create_template_batch(self, templates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        }
         
-        body = {"options": ["all"], "templates": [device_template]}
+        # templateId ties each idMap entry back to its template
+        body = {
+            "options": ["all"],
+            "templates": [{**template, "templateId": str(index)} for index, template in enumerate(templates)],
+        }
         
         base_url = self.settings.wug_base_url.rstrip('/')
         endpoint = f"{base_url}/api/v1/devices/-/config/template"
         
-        response = self.session.patch(
-            endpoint,
-            json=body,
-            headers=headers,
-            timeout=self.settings.sync_timeout_seconds,
-            verify=self.settings.sync_verify_ssl,
-        )
+        response = self._send("PATCH", endpoint, headers, data=orjson.dumps(body))
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         
-        if data and "data" in data:
-            result_data = data["data"]
+        if not data or "data" not in data:
+            return [{"success": False, "message": "Invalid API response format"} for _ in templates]
+        
+        result_data = data["data"]
+        errors = result_data.get("errors") or []
+        id_map = result_data.get("idMap") or []
+        device_ids = {str(entry.get("templateId")): entry.get("resultId") for entry in id_map}
+        
+        # Errors naming a template fail only that template; any other error
+        # fails every template in the batch, as it failed a single create
+        template_errors: dict[str, list[Any]] = {}
+        batch_errors = []
+        for error in errors:
+            template_id = error.get("templateId") if isinstance(error, dict) else None
+            if template_id is None:
+                batch_errors.append(error)
+            else:
+                template_errors.setdefault(str(template_id), []).append(error)
+        
+        results = []
+        created_ips = []
+        for index, template in enumerate(templates):
+            # Fall back to position for servers that do not echo templateId
+            device_id = device_ids.get(str(index))
+            if device_id is None and index < len(id_map) and "templateId" not in id_map[index]:
+                device_id = id_map[index].get("resultId")
             
-            # Check for errors
-            if "errors" in result_data and result_data["errors"]:
-                errors = result_data["errors"]
-                return {
+            interface = template["interfaces"][0]
+            if device_id is not None:
+                # The device exists in WUG even if its create also reported errors
+                created_ips.append(interface["networkAddress"])
+            
+            failed_with = template_errors.get(str(index), []) + batch_errors
+            if failed_with:
+                results.append({
                     "success": False,
-                    "message": f"Device creation had errors: {errors}",
-                    "errors": errors,
-                }
+                    "message": f"Device creation had errors: {failed_with}",
+                    "errors": failed_with,
+                })
+                continue
             
-            # Get device ID from response
-            if "idMap" in result_data and result_data["idMap"]:
-                device_id = result_data["idMap"][0].get("resultId")
-                return {
-                    "success": True,
-                    "device_id": device_id,
-                    "display_name": display_name,
-                    "ip_address": ip_address,
-                    "hostname": hostname,
-                }
-            else:
-                return {
+            if device_id is None:
+                results.append({
                     "success": False,
                     "message": "Device creation response missing device ID",
                     "response_data": result_data,
-                }
-        else:
-            return {"success": False, "message": "Invalid API response format"}
+                })
+                continue
+            
+            results.append({
+                "success": True,
+                "device_id": device_id,
+                "display_name": template["displayName"],
+                "ip_address": interface["networkAddress"],
+                "hostname": interface["networkName"],
+            })
+        
+        if created_ips:
+            # Swap in a new snapshot; callers may still be reading the old one
+            self._known_ips.update("ips", lambda known_ips: known_ips.union(created_ips))
+        return results
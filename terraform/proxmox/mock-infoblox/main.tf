@@ -29,9 +29,9 @@ locals {
   basename = "mock-infoblox"
 }
 
-# Read the mock app content
+# Read the mock app content (shared with the Docker image)
 data "local_file" "app_py" {
-  filename = "${path.module}/app.py"
+  filename = "${path.module}/../../../docker/mock-infoblox/app.py"
 }
 
 # Render cloud-init with app content embedded
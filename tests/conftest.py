@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from wug_infoblox_sync.config import Settings, load_settings
+
+
+@pytest.fixture
+def settings() -> Settings:
+    return dataclasses.replace(
+        load_settings(),
+        wug_base_url="http://wug.test",
+        wug_username="user",
+        wug_password="secret",
+        infoblox_base_url="http://infoblox.test",
+        infoblox_username="admin",
+        infoblox_password="secret",
+        sync_workers=4,
+    )
@@ -0,0 +1,51 @@
+"""Fake requests objects for client tests."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+
+
+class FakeResponse:
+    """Just enough of requests.Response for the clients."""
+
+    def __init__(self, body: Any = None, status_code: int = 200, headers: dict[str, str] | None = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b"" if body is None else orjson.dumps(body)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """
+    Stand-in for requests.Session that records calls and answers them with
+    handler(method, url, kwargs) -> FakeResponse.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls: list[tuple[str, str, dict[str, Any]]] = []
+        self.auth = None
+
+    def request(self, method: str, url: str, **kwargs: Any) -> FakeResponse:
+        self.calls.append((method, url, kwargs))
+        return self.handler(method, url, kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> FakeResponse:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> FakeResponse:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs: Any) -> FakeResponse:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs: Any) -> FakeResponse:
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import gzip
+
+import pytest
+
+from wug_infoblox_sync import app as app_module
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("SYNC_JOB_DIR", str(tmp_path))
+    app_module._settings.cache_clear()
+    flask_app = app_module.create_app()
+    yield flask_app.test_client()
+    app_module._settings.cache_clear()
+
+
+def test_gzip_and_identity_bodies_get_different_etags(client):
+    gzipped = client.get("/", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/", headers={"Accept-Encoding": "identity"})
+
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in identity.headers
+    assert gzipped.headers["ETag"] != identity.headers["ETag"]
+    assert gzipped.headers["ETag"].endswith('-gzip"')
+    assert gzip.decompress(gzipped.data) == identity.data
+    assert "Accept-Encoding" in gzipped.headers["Vary"]
+    assert "Accept-Encoding" in identity.headers["Vary"]
+
+
+def test_not_modified_carries_vary(client):
+    etag = client.get("/", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    response = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+def test_gzip_etag_does_not_match_identity_request(client):
+    etag = client.get("/", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    response = client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+
+
+def test_conditional_json_reuses_gzipped_body():
+    body = b'{"items": [' + b",".join(b'"%d"' % i for i in range(500)) + b"]}"
+    body, etag = app_module._with_etag(body)
+    flask_app = app_module.Flask(__name__)
+    with flask_app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = app_module._conditional_json(body, etag)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.get_etag() == (f"{etag}-gzip", False)
+        assert gzip.decompress(response.get_data()) == body
+    with flask_app.test_request_context(headers={"If-None-Match": f'"{etag}"'}):
+        response = app_module._conditional_json(body, etag)
+        assert response.status_code == 304
+        assert "Accept-Encoding" in response.headers["Vary"]
+
+
+def test_available_ips_rejects_negative_limit(client):
+    response = client.get("/infoblox/networks/ref/available-ips?network=192.168.1.0/24&limit=-1")
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid limit"
+
+
+def test_unhandled_view_error_is_a_json_500(client, monkeypatch):
+    class FailingWUG:
+        def get_devices(self, limit=None):
+            raise RuntimeError("WUG unreachable")
+
+    monkeypatch.setattr(app_module, "_wug_client", lambda settings: FailingWUG())
+    response = client.get("/wug-devices")
+
+    assert response.status_code == 500
+    assert response.get_json() == {
+        "success": False,
+        "error": "WUG unreachable",
+        "message": "Failed to fetch devices from WUG",
+    }
+
+
+def test_http_errors_pass_through_unchanged(client):
+    too_large = client.post("/sync", data=b"x" * (app_module.MAX_CONTENT_LENGTH + 1),
+                            content_type="application/json")
+    assert too_large.status_code == 413
+    assert too_large.mimetype == "text/html"
+
+    missing = client.get("/no-such-endpoint")
+    assert missing.status_code == 404
+    assert missing.mimetype == "text/html"
+
+
+def test_host_stream_that_raced_a_write_is_not_cached(client, monkeypatch):
+    class FakeInfoblox:
+        def __init__(self):
+            self.listings = 0
+
+        def iter_host_records(self, limit=None):
+            self.listings += 1
+            for name in ("a.example.com", "b.example.com"):
+                yield {"hostname": name, "ip_address": "10.0.0.1", "comment": "", "extattrs": {}}
+
+        def delete_host_record(self, hostname):
+            return {"success": True, "message": "deleted"}
+
+    infoblox = FakeInfoblox()
+    monkeypatch.setattr(app_module, "_infoblox_client", lambda settings: infoblox)
+
+    stream = client.get("/infoblox-hosts", buffered=False)
+    chunks = iter(stream.response)
+    next(chunks)
+    assert client.delete("/infoblox-hosts/a.example.com").status_code == 200
+    body = b"".join(chunks)
+    stream.close()
+    assert b'"count":2' in body
+
+    client.get("/infoblox-hosts").get_data()
+    assert infoblox.listings == 2
+    client.get("/infoblox-hosts").get_data()
+    assert infoblox.listings == 2
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from wug_infoblox_sync.cache import TTLCache
+
+
+def test_concurrent_misses_share_one_factory_call():
+    cache = TTLCache(60)
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def factory():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get_or_set, "key", factory) for _ in range(8)]
+        started.wait(5)
+        release.set()
+        results = [f.result(5) for f in futures]
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert cache.get("key") == "value"
+
+
+def test_factory_error_reaches_waiters_and_is_not_cached():
+    cache = TTLCache(60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(cache.get_or_set, "key", failing)
+        started.wait(5)
+        waiter = pool.submit(cache.get_or_set, "key", lambda: "unused")
+        release.set()
+        for future in (leader, waiter):
+            with pytest.raises(RuntimeError, match="upstream down"):
+                future.result(5)
+
+    assert cache.get_or_set("key", lambda: "fresh") == "fresh"
+
+
+def test_fill_started_before_invalidation_is_not_stored():
+    cache = TTLCache(60)
+
+    def factory():
+        # Data read before the invalidation is stale
+        cache.pop("key")
+        return "stale"
+
+    assert cache.get_or_set("key", factory) == "stale"
+    assert cache.get("key") is None
+    assert cache.get_or_set("key", lambda: "fresh") == "fresh"
+    assert cache.get("key") == "fresh"
+
+
+def test_update_replaces_live_entry():
+    cache = TTLCache(60)
+    cache.set("ips", frozenset({"a"}))
+    cache.update("ips", lambda ips: ips | {"b"})
+    assert cache.get("ips") == frozenset({"a", "b"})
+
+
+def test_update_ignores_missing_and_expired_entries(monkeypatch):
+    cache = TTLCache(60)
+    calls = []
+    cache.update("missing", lambda value: calls.append(value))
+    assert calls == []
+    assert cache.get("missing") is None
+
+    now = [1000.0]
+    monkeypatch.setattr("wug_infoblox_sync.cache.time.monotonic", lambda: now[0])
+    cache.set("ips", frozenset())
+    now[0] += 61
+    cache.update("ips", lambda value: calls.append(value))
+    assert calls == []
+    assert cache.get("ips") is None
+
+
+def test_set_with_stale_generation_is_dropped():
+    cache = TTLCache(60)
+    generation = cache.generation
+    cache.clear()
+    cache.set("key", "stale", generation)
+    assert cache.get("key") is None
+
+    cache.set("key", "fresh", cache.generation)
+    assert cache.get("key") == "fresh"
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import orjson
+
+from wug_infoblox_sync.infoblox_client import InfobloxClient
+from wug_infoblox_sync.models import InfobloxHostRecord
+
+from fakes import FakeResponse, FakeSession
+
+
+def host(fqdn, ip):
+    return InfobloxHostRecord(fqdn=fqdn, ip_address=ip, network_view="default", extattrs={})
+
+
+def test_bulk_upsert_keeps_results_in_record_order(settings):
+    existing = {"b.example.com": "record:host/b:b.example.com/default"}
+    batches = []
+
+    def handler(method, url, kwargs):
+        assert url == "http://infoblox.test/wapi/v2.12.3/request"
+        subs = orjson.loads(kwargs["data"])
+        batches.append(subs)
+        results = []
+        for sub in subs:
+            if sub["method"] == "GET":
+                ref = existing.get(sub["data"]["name"])
+                results.append([{"_ref": ref}] if ref else [])
+            elif sub["method"] == "POST":
+                results.append(f"record:host/new:{sub['data']['name']}/default")
+            else:
+                results.append(sub["object"])
+        return FakeResponse(results)
+
+    session = FakeSession(handler)
+    client = InfobloxClient(settings, session=session)
+    records = [host("a.example.com", "10.0.0.1"), host("b.example.com", "10.0.0.2"), host("c.example.com", "10.0.0.3")]
+    results = client.bulk_upsert_host_records(records)
+
+    # One lookup batch and one write batch, each in record order
+    assert len(batches) == 2
+    assert [sub["data"]["name"] for sub in batches[0]] == ["a.example.com", "b.example.com", "c.example.com"]
+    assert [(sub["method"], sub["object"]) for sub in batches[1]] == [
+        ("POST", "record:host"),
+        ("PUT", "record:host/b:b.example.com/default"),
+        ("POST", "record:host"),
+    ]
+    assert [(r["fqdn"], r["action"], r.get("ref")) for r in results] == [
+        ("a.example.com", "created", "record:host/new:a.example.com/default"),
+        ("b.example.com", "updated", None),
+        ("c.example.com", "created", "record:host/new:c.example.com/default"),
+    ]
+
+
+def test_bulk_upsert_of_nothing_sends_no_requests(settings):
+    session = FakeSession(lambda method, url, kwargs: FakeResponse([]))
+    assert InfobloxClient(settings, session=session).bulk_upsert_host_records([]) == []
+    assert session.calls == []
+
+
+def test_bulk_upsert_writes_one_record_per_fqdn(settings):
+    writes = []
+
+    def handler(method, url, kwargs):
+        subs = orjson.loads(kwargs["data"])
+        if subs[0]["method"] == "GET":
+            return FakeResponse([[] for _ in subs])
+        names = [sub["data"]["name"] for sub in subs]
+        # WAPI fails the whole transaction on a duplicate name
+        if len(set(names)) < len(names):
+            return FakeResponse({"Error": "duplicate"}, status_code=400)
+        writes.append(subs)
+        return FakeResponse([f"record:host/new:{name}/default" for name in names])
+
+    client = InfobloxClient(settings, session=FakeSession(handler))
+    records = [host("web.local", "10.0.0.1"), host("db.local", "10.0.0.2"), host("web.local", "10.0.0.3")]
+    results = client.bulk_upsert_host_records(records)
+
+    assert [sub["data"]["ipv4addrs"][0]["ipv4addr"] for sub in writes[0]] == ["10.0.0.2", "10.0.0.3"]
+    assert [(r["action"], r["ip_address"]) for r in results] == [
+        ("superseded", "10.0.0.1"),
+        ("created", "10.0.0.2"),
+        ("created", "10.0.0.3"),
+    ]
+    assert results[0]["changed"] is False
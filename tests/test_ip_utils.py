@@ -0,0 +1,81 @@
+import pytest
+
+from wug_infoblox_sync import ip_utils
+
+
+@pytest.mark.parametrize("address", ["192.168.1.010", "10.1", "10.0.1", "0x0a.0.0.1", "1.2.3.4 ", "256.1.1.1", ""])
+def test_ip_to_int_rejects_non_dotted_quad(address):
+    with pytest.raises(ValueError):
+        ip_utils.ip_to_int(address)
+
+
+def test_ip_to_int_matches_ipv4address():
+    assert ip_utils.ip_to_int("192.168.1.10") == 0xC0A8010A
+    assert ip_utils.ip_to_int("0.0.0.0") == 0
+    assert ip_utils.ip_to_int("255.255.255.255") == 0xFFFFFFFF
+
+
+def test_calculate_utilization_ignores_shorthand_and_leading_zeros():
+    used = ["192.168.1.10", "192.168.1.010", "192.168.1", "10.1", "garbage"]
+    result = ip_utils.calculate_utilization("192.168.1.0/24", used)
+    assert result["used_ips"] == 1
+    assert result["available_ips"] == 253
+
+
+def test_index_ips_drops_invalid_and_sorts():
+    addresses, values = ip_utils.index_ips(["10.0.0.9", "10.1", "10.0.0.2", "10.0.0.010"])
+    assert addresses == ["10.0.0.2", "10.0.0.9"]
+    assert list(values) == [ip_utils.ip_to_int("10.0.0.2"), ip_utils.ip_to_int("10.0.0.9")]
+
+
+def test_group_ips_by_network():
+    ips = ["10.0.1.5", "10.0.0.1", "192.168.1.1", "10.0.0.255", "10.0.0.08"]
+    grouped = ip_utils.group_ips_by_network(ips, ["10.0.0.0/24", "10.0.1.0/24", "172.16.0.0/12"])
+    assert grouped == {
+        "10.0.0.0/24": ["10.0.0.1", "10.0.0.255"],
+        "10.0.1.0/24": ["10.0.1.5"],
+        "172.16.0.0/12": [],
+    }
+
+
+def test_group_ips_by_network_with_prebuilt_index():
+    addresses, values = ip_utils.index_ips(["10.0.0.3", "10.0.0.1"])
+    grouped = ip_utils.group_ips_by_network(addresses, ["10.0.0.0/30"], values)
+    assert grouped == {"10.0.0.0/30": ["10.0.0.1", "10.0.0.3"]}
+
+
+def test_iter_available_ips_skips_used_and_ignores_invalid():
+    available = list(ip_utils.iter_available_ips("10.0.0.0/29", ["10.0.0.1", "10.0.0.3", "10.0.0.02"]))
+    assert available == ["10.0.0.2", "10.0.0.4", "10.0.0.5", "10.0.0.6"]
+
+
+def test_get_available_ips_limit():
+    assert ip_utils.get_available_ips("10.0.0.0/24", ["10.0.0.1"], limit=2) == ["10.0.0.2", "10.0.0.3"]
+
+
+def test_get_next_available_ip_int():
+    _, values = ip_utils.index_ips(["10.0.0.1", "10.0.0.2", "10.0.0.4", "9.0.0.1", "11.0.0.1"])
+    assert ip_utils.get_next_available_ip_int("10.0.0.0/24", values) == "10.0.0.3"
+    _, full = ip_utils.index_ips(["10.0.0.1", "10.0.0.2"])
+    assert ip_utils.get_next_available_ip_int("10.0.0.0/30", full) is None
+
+
+def test_get_usable_ips_small_prefixes():
+    assert list(ip_utils.get_usable_ips("10.0.0.0/30")) == ["10.0.0.1", "10.0.0.2"]
+    assert list(ip_utils.get_usable_ips("10.0.0.0/31")) == ["10.0.0.0", "10.0.0.1"]
+    assert list(ip_utils.get_usable_ips("10.0.0.7/32")) == ["10.0.0.7"]
+
+
+def test_ip_in_network():
+    assert ip_utils.ip_in_network("10.0.0.5", "10.0.0.0/24")
+    assert not ip_utils.ip_in_network("10.0.1.5", "10.0.0.0/24")
+    assert not ip_utils.ip_in_network("10.0.0.05", "10.0.0.0/24")
+    assert not ip_utils.ip_in_network("10.0.0.5", "not-a-network")
+
+
+def test_validators():
+    assert ip_utils.validate_ip("192.168.1.1")
+    assert not ip_utils.validate_ip("192.168.1.01")
+    assert not ip_utils.validate_ip(None)
+    assert ip_utils.validate_network("10.0.0.0/8")
+    assert not ip_utils.validate_network("10.0.0.0/33")
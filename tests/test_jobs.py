@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import threading
+
+from wug_infoblox_sync import jobs
+from wug_infoblox_sync.jobs import JobRunner
+
+
+def _write_state(runner, job_id, **state):
+    runner._write(job_id, {"job_id": job_id, **state})
+
+
+def test_submit_records_completed_result(tmp_path):
+    runner = JobRunner(str(tmp_path))
+    release = threading.Event()
+    job_id = runner.submit(lambda: release.wait(5) and {"success": True})
+
+    running = runner.status(job_id)
+    assert running["status"] == "running"
+    assert running["pid"] > 0 and running["started_at"] > 0
+
+    release.set()
+    runner._executor.shutdown(wait=True)
+    assert runner.status(job_id) == {"job_id": job_id, "status": "completed", "result": {"success": True}}
+
+
+def test_running_job_of_dead_process_reports_failed(tmp_path, monkeypatch):
+    runner = JobRunner(str(tmp_path))
+    job_id = "a" * 32
+    _write_state(runner, job_id, status="running", pid=4242, host="box", started_at=jobs.time.time())
+    monkeypatch.setattr(jobs.socket, "gethostname", lambda: "box")
+    monkeypatch.setattr(jobs, "_process_alive", lambda pid: False)
+
+    state = runner.status(job_id)
+    assert state["status"] == "failed"
+    assert "exited" in state["error"]
+
+
+def test_running_job_on_other_host_is_not_probed(tmp_path, monkeypatch):
+    runner = JobRunner(str(tmp_path))
+    job_id = "b" * 32
+    _write_state(runner, job_id, status="running", pid=4242, host="other", started_at=jobs.time.time())
+    monkeypatch.setattr(jobs.socket, "gethostname", lambda: "box")
+    monkeypatch.setattr(jobs, "_process_alive", lambda pid: False)
+
+    assert runner.status(job_id)["status"] == "running"
+
+
+def test_running_job_past_timeout_reports_failed(tmp_path):
+    runner = JobRunner(str(tmp_path))
+    job_id = "c" * 32
+    started = jobs.time.time() - jobs.JOB_TIMEOUT_SECONDS - 1
+    _write_state(runner, job_id, status="running", pid=jobs.os.getpid(),
+                 host=jobs.socket.gethostname(), started_at=started)
+
+    state = runner.status(job_id)
+    assert state["status"] == "failed"
+    assert "did not finish" in state["error"]
+
+
+def test_unknown_and_invalid_job_ids(tmp_path):
+    runner = JobRunner(str(tmp_path))
+    assert runner.status("d" * 32) is None
+    assert runner.status("../etc/passwd") is None
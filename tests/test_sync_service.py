@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+
+from wug_infoblox_sync import sync_service
+from wug_infoblox_sync.models import WUGDevice
+from wug_infoblox_sync.sync_service import SyncService
+
+
+def device(source_id, hostname, ip):
+    return WUGDevice(source_id=source_id, hostname=hostname, ip_address=ip, status="Up", raw={})
+
+
+class FakeWUG:
+    def __init__(self, devices=(), known_ips=frozenset()):
+        self.devices = list(devices)
+        self.known_ips = known_ips
+        self.templates = []
+
+    def iter_devices(self, limit=None):
+        return iter(self.devices)
+
+    def get_known_ip_set(self):
+        return self.known_ips
+
+    device_template = staticmethod(lambda display_name, ip_address, hostname: {"ip": ip_address})
+
+    def create_devices_bulk(self, templates, batch_size):
+        self.templates.extend(templates)
+        return [{"success": True, "device_id": t["ip"]} for t in templates]
+
+
+class FakeInfoblox:
+    """Upserts into a dict one record at a time and records each batch's FQDNs."""
+
+    def __init__(self, records=()):
+        self.records: dict[str, str] = {}
+        self.batches: list[list[str]] = []
+        self.host_records = list(records)
+        self.lock = threading.Lock()
+
+    def bulk_upsert_host_records(self, records):
+        results = []
+        with self.lock:
+            self.batches.append([record.fqdn for record in records])
+            for record in records:
+                action = "updated" if record.fqdn in self.records else "created"
+                self.records[record.fqdn] = record.ip_address
+                results.append({"changed": True, "action": action, "fqdn": record.fqdn})
+        return results
+
+    def get_all_host_records(self, limit=None):
+        return self.host_records
+
+
+def test_same_fqdn_in_later_batch_is_synced_after_the_first(settings, monkeypatch):
+    monkeypatch.setattr(sync_service, "BULK_BATCH_SIZE", 2)
+    # "Web Server" and "web-server" both normalize to web-server.local
+    devices = [
+        device("1", "Web Server", "10.0.0.1"),
+        device("2", "db", "10.0.0.2"),
+        device("3", "web-server", "10.0.0.3"),
+        device("4", "mail", "10.0.0.4"),
+    ]
+    infoblox = FakeInfoblox()
+    service = SyncService(settings, wug_client=FakeWUG(devices), infoblox_client=infoblox)
+    result = service.run_sync(dry_run=False)
+
+    assert [detail.device_id for detail in result.details] == ["1", "2", "3", "4"]
+    assert [detail.result["action"] for detail in result.details] == ["created", "created", "updated", "created"]
+    assert infoblox.records["web-server.local"] == "10.0.0.3"
+    # The repeat waited for the concurrent batches instead of racing them
+    assert infoblox.batches[-1] == ["web-server.local"]
+    assert result.errors == 0
+
+
+
+def test_reverse_sync_creates_a_shared_ip_once(settings):
+    records = [
+        {"hostname": "www.example.com", "ip_address": "10.0.0.5"},
+        {"hostname": "alias.example.com", "ip_address": "10.0.0.5"},
+        {"hostname": "old.example.com", "ip_address": "10.0.0.9"},
+    ]
+    wug = FakeWUG(known_ips=frozenset({"10.0.0.9"}))
+    service = SyncService(settings, wug_client=wug, infoblox_client=FakeInfoblox(records))
+    result = service.run_reverse_sync(dry_run=False)
+
+    assert [t["ip"] for t in wug.templates] == ["10.0.0.5"]
+    assert [(d.hostname, d.action) for d in result.details] == [
+        ("www.example.com", "created"),
+        ("alias.example.com", "skipped"),
+        ("old.example.com", "skipped"),
+    ]
+    assert result.details[1].reason == "Device already exists in WUG"
+    assert (result.created_or_updated, result.skipped) == (1, 2)
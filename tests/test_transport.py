@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import pytest
+from urllib3.response import HTTPResponse
+
+from wug_infoblox_sync import transport
+from wug_infoblox_sync.config import load_settings
+from wug_infoblox_sync.transport import KeepAliveAdapter, RateLimitedRetry, RateLimiter, build_session
+
+
+class FakeClock:
+    """Drives time.monotonic/time.sleep so the limiter runs without waiting."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(transport.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(transport.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_rate_limiter_allows_a_burst_then_paces(clock):
+    limiter = RateLimiter(4)
+    for _ in range(4):
+        limiter.acquire()
+    assert clock.sleeps == []
+
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(0.25)]
+
+
+def test_rate_limiter_pause_holds_back_requests(clock):
+    limiter = RateLimiter(10)
+    limiter.pause(3)
+    limiter.acquire()
+    assert sum(clock.sleeps) == pytest.approx(3)
+
+
+def test_retry_after_pauses_the_shared_limiter(clock):
+    limiter = RateLimiter(10)
+    retry = RateLimitedRetry(total=3, status_forcelist=(429,))
+    retry.rate_limiter = limiter
+    # The limiter must survive urllib3 copying the Retry per attempt
+    retry = retry.new(total=2)
+    assert retry.rate_limiter is limiter
+
+    start = clock.now
+    response = HTTPResponse(status=429, headers={"Retry-After": "2"})
+    assert retry.sleep_for_retry(response)
+    assert limiter._paused_until == pytest.approx(start + 2)
+
+
+def test_build_session_shares_one_limiter():
+    session = build_session(workers=100, requests_per_second=5)
+    adapter = session.get_adapter("https://example.test")
+    assert isinstance(adapter, KeepAliveAdapter)
+    assert adapter is session.get_adapter("http://example.test")
+    assert adapter.max_retries.rate_limiter is adapter.rate_limiter
+    assert adapter.rate_limiter.rate == 5
+    assert adapter._pool_maxsize == 100
+
+    unlimited = build_session().get_adapter("https://example.test")
+    assert unlimited.rate_limiter is None
+
+
+def test_retries_take_a_limiter_token(clock):
+    limiter = RateLimiter(1)
+    retry = RateLimitedRetry(total=3, backoff_factor=0)
+    retry.rate_limiter = limiter
+    limiter.acquire()
+
+    retry.sleep()
+    # The retry waited for the next token instead of bypassing the limiter
+    assert clock.sleeps == [pytest.approx(1)]
+
+
+def test_wug_rate_limit_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("WUG_REQUESTS_PER_SECOND", raising=False)
+    assert load_settings().wug_requests_per_second == 0
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import orjson
+import pytest
+
+from wug_infoblox_sync.wug_client import WUGClient
+
+from fakes import FakeResponse, FakeSession
+
+TOKEN = {"access_token": "token", "expires_in": 3600}
+
+
+def make_client(settings, patch_handler, devices=()):
+    """WUG client whose template PATCHes are answered by patch_handler(templates)."""
+    def handler(method, url, kwargs):
+        if url.endswith("/api/v1/token"):
+            return FakeResponse(TOKEN)
+        if method == "PATCH":
+            return patch_handler(orjson.loads(kwargs["data"])["templates"])
+        if url.endswith("/device-groups/-"):
+            return FakeResponse({"data": {"groups": [{"id": 1, "name": "All"}]}})
+        return FakeResponse({"data": {"devices": list(devices)}})
+
+    session = FakeSession(handler)
+    return WUGClient(settings, session=session), session
+
+
+def templates_for(*ips):
+    return [WUGClient.device_template(f"host-{ip}", ip) for ip in ips]
+
+
+def test_id_map_is_matched_by_template_id(settings):
+    def patch(templates):
+        # Answer out of order; templateId ties results back
+        id_map = [{"templateId": t["templateId"], "resultId": f"id-{t['displayName']}"} for t in templates]
+        return FakeResponse({"data": {"idMap": id_map[::-1], "errors": []}})
+
+    client, _ = make_client(settings, patch)
+    results = client.create_devices_bulk(templates_for("10.0.0.1", "10.0.0.2", "10.0.0.3"))
+    assert [r["device_id"] for r in results] == ["id-host-10.0.0.1", "id-host-10.0.0.2", "id-host-10.0.0.3"]
+    assert all(r["success"] for r in results)
+    assert results[1]["ip_address"] == "10.0.0.2"
+
+
+def test_id_map_falls_back_to_position_without_template_id(settings):
+    def patch(templates):
+        return FakeResponse({"data": {"idMap": [{"resultId": f"id-{i}"} for i in range(len(templates))]}})
+
+    client, _ = make_client(settings, patch)
+    results = client.create_devices_bulk(templates_for("10.0.0.1", "10.0.0.2"))
+    assert [r["device_id"] for r in results] == ["id-0", "id-1"]
+
+
+def test_unattributed_errors_fail_every_template(settings):
+    def patch(templates):
+        id_map = [{"templateId": t["templateId"], "resultId": "9"} for t in templates]
+        return FakeResponse({"data": {"idMap": id_map, "errors": ["license limit reached"]}})
+
+    client, _ = make_client(settings, patch)
+    results = client.create_devices_bulk(templates_for("10.0.0.1", "10.0.0.2"))
+    assert [r["success"] for r in results] == [False, False]
+    assert results[0]["errors"] == ["license limit reached"]
+
+
+def test_template_errors_fail_only_that_template(settings):
+    def patch(templates):
+        return FakeResponse({
+            "data": {
+                "idMap": [{"templateId": "0", "resultId": "a"}],
+                "errors": [{"templateId": "1", "messages": ["bad address"]}],
+            }
+        })
+
+    client, _ = make_client(settings, patch)
+    results = client.create_devices_bulk(templates_for("10.0.0.1", "10.0.0.2"))
+    assert results[0]["success"] and results[0]["device_id"] == "a"
+    assert not results[1]["success"]
+    assert results[1]["errors"] == [{"templateId": "1", "messages": ["bad address"]}]
+
+
+def test_missing_device_id_is_a_failure(settings):
+    client, _ = make_client(settings, lambda templates: FakeResponse({"data": {"idMap": []}}))
+    [result] = client.create_devices_bulk(templates_for("10.0.0.1"))
+    assert not result["success"]
+    assert result["message"] == "Device creation response missing device ID"
+
+
+def test_create_device_keeps_single_result_shape(settings):
+    def patch(templates):
+        return FakeResponse({"data": {"idMap": [{"templateId": "0", "resultId": "42"}], "errors": []}})
+
+    client, _ = make_client(settings, patch)
+    assert client.create_device("edge", "10.0.0.7") == {
+        "success": True,
+        "device_id": "42",
+        "display_name": "edge",
+        "ip_address": "10.0.0.7",
+        "hostname": "edge",
+    }
+
+
+def test_bulk_create_is_split_into_batches(settings):
+    sizes = []
+
+    def patch(templates):
+        sizes.append(len(templates))
+        return FakeResponse({"data": {"idMap": [{"templateId": t["templateId"], "resultId": "x"} for t in templates]}})
+
+    client, session = make_client(settings, patch)
+    ips = [f"10.0.{i // 200}.{i % 200 + 1}" for i in range(120)]
+    results = client.create_devices_bulk(templates_for(*ips), batch_size=50)
+    assert sizes == [50, 50, 20]
+    assert len(results) == 120
+    # One token for the whole run
+    assert sum(url.endswith("/api/v1/token") for _, url, _ in session.calls) == 1
+
+
+def test_failed_batch_request_raises(settings):
+    client, _ = make_client(settings, lambda templates: FakeResponse({}, status_code=500))
+    with pytest.raises(RuntimeError):
+        client.create_devices_bulk(templates_for("10.0.0.1"))
+
+
+def test_known_ip_snapshot_is_replaced_not_mutated_on_create(settings):
+    def patch(templates):
+        return FakeResponse({"data": {"idMap": [{"templateId": "0", "resultId": "1"}]}})
+
+    client, _ = make_client(settings, patch, devices=[{"id": 1, "networkAddress": "10.0.0.1"}])
+    snapshot = client.get_known_ip_set()
+    assert snapshot == frozenset({"10.0.0.1"})
+
+    client.create_device("new", "10.0.0.2")
+
+    assert snapshot == frozenset({"10.0.0.1"})
+    assert client.get_known_ip_set() == frozenset({"10.0.0.1", "10.0.0.2"})
+    assert client.device_exists("10.0.0.2")
+
+
+def test_groups_are_fetched_once_each_regardless_of_device_count(settings):
+    groups = [
+        {"id": 1, "name": "Parent", "deviceCount": 0},
+        {"id": 2, "name": "Child", "deviceCount": 1},
+        {"id": 1, "name": "Parent", "deviceCount": 0},
+    ]
+    devices = {
+        1: [{"id": "a", "networkAddress": "10.0.0.1", "hostName": "a"}],
+        2: [{"id": "b", "networkAddress": "10.0.0.2", "hostName": "b"}],
+    }
+
+    def handler(method, url, kwargs):
+        if url.endswith("/api/v1/token"):
+            return FakeResponse(TOKEN)
+        if url.endswith("/device-groups/-"):
+            return FakeResponse({"data": {"groups": groups}})
+        group_id = int(url.split("/device-groups/")[1].split("/")[0])
+        return FakeResponse({"data": {"devices": devices[group_id]}})
+
+    session = FakeSession(handler)
+    client = WUGClient(settings, session=session)
+
+    # A zero deviceCount does not hide the devices its listing returns
+    assert [device.ip_address for device in client.iter_devices()] == ["10.0.0.1", "10.0.0.2"]
+    device_urls = [url for _, url, _ in session.calls if url.endswith("/devices")]
+    assert len(device_urls) == 2